@@ -0,0 +1,99 @@
+import json
+import time
+from functools import lru_cache
+
+from django.http import HttpResponse
+from django.test import RequestFactory
+from jwt_auth import mixins, views
+from jwt_auth.core import User
+from jwt_auth.middleware import (
+    JWTAuthenticationMiddleware,
+    RequiredJWTAuthenticationMiddleware,
+)
+
+from benchmarks.runner import benchmark
+
+USERNAME = "benchmark"
+PASSWORD = "password"
+
+factory = RequestFactory()
+
+
+@lru_cache(maxsize=None)
+def get_fixture():
+    """Return the user of the benchmarks and a valid token."""
+    user = User.objects.create_user(USERNAME, "benchmark@example.com", PASSWORD)
+    token = views.jwt_encode_token(user, orig_iat=int(time.time()))
+    return user, token
+
+
+def get_request(path="/plain/"):
+    _, token = get_fixture()
+    return factory.get(path, HTTP_AUTHORIZATION="Bearer {0}".format(token))
+
+
+def get_response(request):
+    # Views of the benchmarks read request.user
+    return HttpResponse(request.user.pk)
+
+
+@benchmark
+def get_token_from_request():
+    request = get_request()
+    return lambda: mixins.get_token_from_request(request)
+
+
+@benchmark
+def get_payload_from_token():
+    _, token = get_fixture()
+    return lambda: mixins.get_payload_from_token(token)
+
+
+@benchmark
+def get_user():
+    user, _ = get_fixture()
+    return lambda: mixins.get_user(user.pk)
+
+
+@benchmark
+def jwt_authentication_middleware():
+    middleware = JWTAuthenticationMiddleware(get_response)
+
+    def operation():
+        middleware(get_request())
+
+    return operation
+
+
+@benchmark
+def required_jwt_authentication_middleware():
+    middleware = RequiredJWTAuthenticationMiddleware(get_response)
+
+    def operation():
+        middleware(get_request())
+
+    return operation
+
+
+@benchmark
+def login():
+    get_fixture()
+    body = json.dumps({"username": USERNAME, "password": PASSWORD})
+
+    def operation():
+        request = factory.post("/token-auth/", body, content_type="application/json")
+        views.jwt_token(request)
+
+    return operation
+
+
+@benchmark
+def refresh():
+    _, token = get_fixture()
+    body = json.dumps({"token": token})
+
+    def operation():
+        request = factory.post("/token-refresh/", body, content_type="application/json")
+        views.refresh_jwt_token(request)
+
+    return operation
@@ -0,0 +1,135 @@
+import json
+import time
+import tracemalloc
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+BENCHMARKS = []
+
+
+def benchmark(func):
+    """Register a benchmark, a function returning the operation to measure."""
+    BENCHMARKS.append(func)
+    return func
+
+
+def get_percentile(sorted_timings, percentile):
+    index = min(len(sorted_timings) - 1, int(len(sorted_timings) * percentile))
+    return sorted_timings[index]
+
+
+def measure(operation, iterations, warmup):
+    for _ in range(warmup):
+        operation()
+
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+
+    # The memory and the queries are measured apart, tracing slows down the
+    # timings. The peak is the growth of the traced memory during an operation,
+    # not the total size of its allocations (the freed blocks are reused)
+    samples = max(1, iterations // 10)
+    peak_sizes = 0
+    tracemalloc.start()
+    try:
+        for _ in range(samples):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            operation()
+            peak_sizes += tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+
+    with CaptureQueriesContext(connection) as queries:
+        for _ in range(samples):
+            operation()
+
+    return {
+        "ops_per_sec": len(timings) / sum(timings),
+        "p50_us": get_percentile(timings, 0.50) * 1e6,
+        "p99_us": get_percentile(timings, 0.99) * 1e6,
+        "peak_bytes": peak_sizes / samples,
+        "queries": len(queries) / samples,
+    }
+
+
+def run(iterations, warmup, names=None):
+    results = {}
+    for func in BENCHMARKS:
+        if names and func.__name__ not in names:
+            continue
+        results[func.__name__] = measure(func(), iterations, warmup)
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Return the regressions against the baseline, a benchmark regresses when
+    its throughput drops by more than `tolerance` (ratio) or when it runs more
+    queries.
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+
+        if result["ops_per_sec"] < reference["ops_per_sec"] * (1 - tolerance):
+            regressions.append(
+                "{0}: {1:.0f} ops/s (baseline {2:.0f} ops/s)".format(
+                    name, result["ops_per_sec"], reference["ops_per_sec"]
+                )
+            )
+        if result["queries"] > reference["queries"]:
+            regressions.append(
+                "{0}: {1:.1f} queries (baseline {2:.1f})".format(
+                    name, result["queries"], reference["queries"]
+                )
+            )
+
+    return regressions
+
+
+def format_results(results, baseline=None):
+    lines = [
+        "{0:<36} {1:>12} {2:>10} {3:>10} {4:>12} {5:>8} {6:>8}".format(
+            "benchmark", "ops/s", "p50 (us)", "p99 (us)", "peak (B)", "queries", "delta"
+        )
+    ]
+    for name, result in results.items():
+        delta = ""
+        if baseline and name in baseline:
+            ratio = result["ops_per_sec"] / baseline[name]["ops_per_sec"] - 1
+            delta = "{0:+.1%}".format(ratio)
+        lines.append(
+            "{0:<36} {1:>12.0f} {2:>10.1f} {3:>10.1f} {4:>12.0f} {5:>8.1f} {6:>8}".format(
+                name,
+                result["ops_per_sec"],
+                result["p50_us"],
+                result["p99_us"],
+                result["peak_bytes"],
+                result["queries"],
+                delta,
+            )
+        )
+
+    return "\n".join(lines)
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path, results):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
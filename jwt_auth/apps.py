@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class JWTAuthConfig(AppConfig):
+    name = "jwt_auth"
+    verbose_name = "JWT Auth"
+    default_auto_field = "django.db.models.BigAutoField"
@@ -0,0 +1,133 @@
+import itertools
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.db.models import QuerySet
+from jwt_auth import utils
+from jwt_auth.core import User
+from jwt_auth.settings import get_settings
+from jwt_auth.workers import setup_worker, sign_payloads
+
+
+def embeds_permissions(settings):
+    """Return whether the payloads embed the permissions of the users."""
+    return (
+        settings.JWT_EMBED_SCOPES
+        and settings.JWT_SCOPES_HANDLER is utils.jwt_get_scopes_handler
+    )
+
+
+def get_default_fields():
+    """Fields of the user read by the default payload and scopes handlers."""
+    fields = (User.USERNAME_FIELD, User.get_email_field_name())
+    if embeds_permissions(get_settings()):
+        # Read by user.has_perm()
+        names = {field.name for field in User._meta.concrete_fields}
+        fields += tuple(name for name in ("is_active", "is_superuser") if name in names)
+
+    return fields
+
+
+def prefetch_permissions(users):
+    """
+    Load the permissions of the users in two queries instead of two by user,
+    in the cache of the `ModelBackend` read by `user.has_perm()`.
+    """
+    # pylint: disable=import-outside-toplevel,protected-access
+    from django.contrib.auth.models import Permission
+
+    if not hasattr(User, "user_permissions"):
+        return
+
+    perms = {user.pk: set() for user in users}
+    rows = itertools.chain(
+        Permission.objects.filter(user__in=perms).values_list(
+            "user", "content_type__app_label", "codename"
+        ).order_by(),
+        Permission.objects.filter(group__user__in=perms).values_list(
+            "group__user", "content_type__app_label", "codename"
+        ).order_by(),
+    )
+    for pk, app_label, codename in rows:
+        perms[pk].add("{0}.{1}".format(app_label, codename))
+
+    for user in users:
+        user._perm_cache = perms[user.pk]
+
+
+def iter_chunks(users, chunk_size, fields=None):
+    """
+    Yield lists of users. A queryset is paginated by primary key, each chunk
+    being fetched with `.only(*fields)`.
+    """
+    if not isinstance(users, QuerySet):
+        users = iter(users)
+        while True:
+            chunk = list(itertools.islice(users, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    if fields is None:
+        fields = get_default_fields()
+    users = users.only(*fields).order_by("pk")
+
+    last_pk = None
+    while True:
+        page = users if last_pk is None else users.filter(pk__gt=last_pk)
+        chunk = list(page[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1].pk
+
+
+def issue_tokens(
+    users, chunk_size=1000, processes=None, fields=None, orig_iat=None, mp_context=None
+):
+    """
+    Yield a `(user_id, token)` pair by user of `users`, a queryset or an
+    iterable of users, in the same order (by primary key for a queryset).
+
+    The payloads are built chunk by chunk in the current process. With
+    `processes`, the chunks are signed by a pool of processes, at most two
+    chunks by process being in flight, started with the `mp_context`
+    multiprocessing context (the default start method otherwise). `fields` are the fields of the user
+    loaded from a queryset, it should list all the fields read by a custom
+    `JWT_PAYLOAD_HANDLER`. The permissions embedded by the default
+    `JWT_SCOPES_HANDLER` are loaded by chunk.
+    """
+    settings = get_settings()
+    if orig_iat is None and settings.JWT_ALLOW_REFRESH:
+        orig_iat = int(time.time())
+
+    def get_payloads(chunk):
+        if embeds_permissions(settings):
+            prefetch_permissions(chunk)
+
+        payloads = []
+        for user in chunk:
+            payload = settings.JWT_PAYLOAD_HANDLER(user)
+            if orig_iat is not None:
+                payload["orig_iat"] = orig_iat
+            payloads.append((user.pk, payload))
+        return payloads
+
+    chunks = iter_chunks(users, chunk_size, fields)
+    if not processes:
+        for chunk in chunks:
+            yield from sign_payloads(get_payloads(chunk))
+        return
+
+    with ProcessPoolExecutor(
+        processes, mp_context=mp_context, initializer=setup_worker
+    ) as executor:
+        futures = deque()
+        for chunk in chunks:
+            futures.append(executor.submit(sign_payloads, get_payloads(chunk)))
+            if len(futures) >= processes * 2:
+                yield from futures.popleft().result()
+
+        while futures:
+            yield from futures.popleft().result()
@@ -0,0 +1,260 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from jwt_auth.core import User
+from jwt_auth.settings import get_settings
+from jwt_auth.utils import get_seconds, import_from_string
+
+
+class LRUCache:
+    """
+    Bounded, thread-safe, in-process LRU cache whose entries carry their own
+    expiration timestamp. The `hits` and `misses` counters allow to measure
+    its efficiency.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the cached value or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if time.time() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+
+                del self._entries[key]
+
+            self.misses += 1
+
+        return None
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+
+class VerifiedTokenCache(LRUCache):
+    """
+    Cache of tokens whose signature has already been verified.
+
+    Entries are keyed by a SHA-256 digest of the raw token, so the cache never
+    holds credentials, and an entry never outlives the `exp` claim of the
+    token it was decoded from (nor `ttl` seconds when set).
+    """
+
+    def __init__(self, maxsize, ttl=None):
+        super().__init__(maxsize)
+        self.ttl = get_seconds(ttl)
+
+    @staticmethod
+    def get_key(token):
+        if isinstance(token, str):
+            token = token.encode("utf-8")
+
+        return hashlib.sha256(token).digest()
+
+    def get(self, token):
+        """Return the cached payload of the token or None."""
+        return super().get(self.get_key(token))
+
+    def set(self, token, payload):  # pylint: disable=arguments-differ
+        expires_at = payload.get("exp")
+        if self.ttl is not None:
+            max_expires_at = time.time() + self.ttl
+            if expires_at is None or expires_at > max_expires_at:
+                expires_at = max_expires_at
+
+        if expires_at is None:
+            # Without expiration claim nor TTL, the entry would live forever.
+            return
+
+        super().set(self.get_key(token), payload, expires_at)
+
+
+class UserCache:
+    """
+    Two-level cache of the active users resolved from tokens: a small
+    in-process LRU (L1) in front of a Django cache backend (L2).
+
+    Entries are invalidated on `post_save` and `post_delete` of the user model.
+    As other processes only see the invalidation in L2, keep `local_ttl`
+    short. A copy of the cached instance is returned so request handlers can't
+    alter the cached one.
+    """
+
+    key_prefix = "jwt_auth:user:"
+
+    def __init__(self, alias="default", timeout=300, local_size=1024, local_ttl=5):
+        self.alias = alias
+        self.timeout = get_seconds(timeout)
+        self.local_ttl = get_seconds(local_ttl)
+        self.local = LRUCache(local_size) if local_size else None
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get_key(self, user_id):
+        return "{0}{1}".format(self.key_prefix, user_id)
+
+    def get(self, user_id):
+        """Return a copy of the cached user or None."""
+        key = self.get_key(user_id)
+        if self.local is not None:
+            user = self.local.get(key)
+            if user is not None:
+                return copy.copy(user)
+
+        user = self.cache.get(key)
+        if user is not None and self.local is not None:
+            self.local.set(key, user, time.time() + self.local_ttl)
+
+        return copy.copy(user) if user is not None else None
+
+    async def aget(self, user_id):
+        key = self.get_key(user_id)
+        if self.local is not None:
+            user = self.local.get(key)
+            if user is not None:
+                return copy.copy(user)
+
+        user = await self.cache.aget(key)
+        if user is not None and self.local is not None:
+            self.local.set(key, user, time.time() + self.local_ttl)
+
+        return copy.copy(user) if user is not None else None
+
+    def set(self, user):
+        key = self.get_key(user.pk)
+        self.cache.set(key, user, self.timeout)
+        if self.local is not None:
+            self.local.set(key, copy.copy(user), time.time() + self.local_ttl)
+
+    async def aset(self, user):
+        key = self.get_key(user.pk)
+        await self.cache.aset(key, user, self.timeout)
+        if self.local is not None:
+            self.local.set(key, copy.copy(user), time.time() + self.local_ttl)
+
+    def delete(self, user_id):
+        key = self.get_key(user_id)
+        self.cache.delete(key)
+        if self.local is not None:
+            self.local.delete(key)
+
+
+_token_cache = None
+
+
+def get_token_cache():
+    """
+    Return the process-wide verified token cache, or None when disabled by
+    `JWT_TOKEN_CACHE_SIZE`.
+    """
+    global _token_cache  # pylint: disable=global-statement
+
+    settings = get_settings()
+    if _token_cache is None and settings.JWT_TOKEN_CACHE_SIZE:
+        _token_cache = VerifiedTokenCache(
+            settings.JWT_TOKEN_CACHE_SIZE, settings.JWT_TOKEN_CACHE_TTL
+        )
+
+    return _token_cache
+
+
+_user_cache = None
+
+
+def get_user_cache():
+    """
+    Return the process-wide user cache, or None when `JWT_USER_CACHE` is unset.
+    """
+    global _user_cache  # pylint: disable=global-statement
+
+    settings = get_settings()
+    if _user_cache is None and settings.JWT_USER_CACHE:
+        user_cache_class = import_from_string(settings.JWT_USER_CACHE)
+        _user_cache = user_cache_class(
+            alias=settings.JWT_USER_CACHE_ALIAS,
+            timeout=settings.JWT_USER_CACHE_TTL,
+            local_size=settings.JWT_USER_CACHE_LOCAL_SIZE,
+            local_ttl=settings.JWT_USER_CACHE_LOCAL_TTL,
+        )
+
+    return _user_cache
+
+
+def clear_token_cache():
+    """Forget the verified tokens, eg. when a verification key is dropped."""
+    if _token_cache is not None:
+        _token_cache.clear()
+
+
+def reset_caches(*args, **kwargs):  # pylint: disable=unused-argument
+    """Discard the caches when their settings are changed."""
+    global _token_cache, _user_cache  # pylint: disable=global-statement
+
+    setting = kwargs.get("setting", "")
+    if setting.startswith("JWT_USER_CACHE"):
+        _user_cache = None
+    elif setting.startswith("JWT_") or setting == "SECRET_KEY":
+        # The tokens were verified with the previous keys and options
+        _token_cache = None
+
+
+setting_changed.connect(reset_caches, dispatch_uid="jwt_auth_reset_caches")
+
+
+# pylint: disable-next=unused-argument
+def invalidate_user(sender, instance, using=None, **kwargs):
+    user_cache = get_user_cache()
+    if user_cache is not None:
+        user_id = instance.pk
+        user_cache.delete(user_id)
+        # Until the commit, the concurrent requests still read the previous row
+        # and may cache it again
+        transaction.on_commit(lambda: user_cache.delete(user_id), using=using)
+
+
+post_save.connect(invalidate_user, sender=User, dispatch_uid="jwt_auth_user_saved")
+post_delete.connect(invalidate_user, sender=User, dispatch_uid="jwt_auth_user_deleted")
@@ -0,0 +1,91 @@
+import importlib
+import json
+
+import jwt
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from jwt_auth import settings as jwt_auth_settings
+from jwt_auth import utils
+
+
+class StdlibJSONCodec:
+    """Default codec, the `json` module with the encoder of `JsonResponse`."""
+
+    @staticmethod
+    def dumps(obj):
+        return json.dumps(obj, cls=DjangoJSONEncoder, separators=(",", ":"))
+
+    loads = staticmethod(json.loads)
+
+
+def load_codec(codec):
+    """
+    Return the codec named by `codec`, the dotted path of a module (eg.
+    "orjson" or "ujson") or of an object, whose `dumps(obj)` returns str or
+    bytes and `loads(data)` accepts str or bytes.
+    """
+    if codec is None:
+        return StdlibJSONCodec
+
+    if not isinstance(codec, str):
+        return codec
+
+    try:
+        return importlib.import_module(codec)
+    except ImportError:
+        pass
+
+    try:
+        return utils.import_from_string(codec)
+    except (AttributeError, ImportError, ValueError):
+        raise ImproperlyConfigured(
+            "JWT_JSON_CODEC '%s' can't be imported, is it installed? (the orjson "
+            "codec is provided by the 'orjson' extra: "
+            "pip install webstack-django-jwt-auth[orjson])" % codec
+        )
+
+
+def dumps_bytes(codec, obj):
+    data = codec.dumps(obj)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+
+    return data
+
+
+class CodecPyJWT(jwt.PyJWT):
+    """PyJWT serializing the claims of the tokens with another JSON codec."""
+
+    def __init__(self, codec, options=None):
+        if not hasattr(jwt.PyJWT, "_decode_payload"):
+            raise ImproperlyConfigured(
+                "JWT_JSON_CODEC requires a PyJWT version supporting the "
+                "serialization of the payload by subclasses, upgrade PyJWT."
+            )
+
+        super().__init__(options)
+        self.codec = codec
+
+    def _encode_payload(self, payload, headers=None, json_encoder=None):
+        return dumps_bytes(self.codec, payload)
+
+    def _decode_payload(self, decoded):
+        try:
+            payload = self.codec.loads(decoded["payload"])
+        except (ValueError, RecursionError) as error:
+            raise jwt.DecodeError("Invalid payload string: {0}".format(error))
+
+        if not isinstance(payload, dict):
+            raise jwt.DecodeError("Invalid payload string: must be a json object")
+
+        return payload
+
+
+def json_response(data, status=200):
+    """`JsonResponse` rendered by the `JWT_JSON_CODEC` codec."""
+    return HttpResponse(
+        dumps_bytes(jwt_auth_settings.get_settings().JSON_CODEC, data),
+        status=status,
+        content_type="application/json",
+    )
@@ -1,3 +1,98 @@
+from collections.abc import Iterable
+
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.db.models.manager import EmptyManager
 
 User = get_user_model()
+
+
+class TokenUser:
+    """
+    Lightweight user built from the claims of a verified token without any
+    database query, the model instance is only fetched by `get_user()`.
+
+    The extra claims are available as attributes. The permissions are the
+    `scopes` of the token (see `JWT_EMBED_SCOPES`), it has no groups.
+    """
+
+    __slots__ = ("pk", "username", "email", "claims", "scopes", "_user")
+
+    is_active = True
+    is_anonymous = False
+    is_authenticated = True
+    is_staff = False
+    is_superuser = False
+
+    _groups = EmptyManager(Group)
+    _user_permissions = EmptyManager(Permission)
+
+    def __init__(self, user_id, payload, extra_claims=(), scopes=frozenset()):
+        self.pk = user_id
+        self.username = payload.get("username", "")
+        self.email = payload.get("email", "")
+        self.claims = {name: payload.get(name) for name in extra_claims}
+        self.scopes = scopes
+        self._user = None
+
+    def __getattr__(self, name):
+        if name != "claims" and name in self.claims:
+            return self.claims[name]
+
+        raise AttributeError(
+            "'{0}' object has no attribute '{1}'".format(type(self).__name__, name)
+        )
+
+    def __str__(self):
+        return self.username
+
+    def __eq__(self, other):
+        if isinstance(other, (TokenUser, User)):
+            return self.pk == other.pk
+
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    @property
+    def id(self):
+        return self.pk
+
+    @property
+    def groups(self):
+        return self._groups
+
+    @property
+    def user_permissions(self):
+        return self._user_permissions
+
+    def get_username(self):
+        return self.username
+
+    def has_perm(self, perm, obj=None):
+        # The object permissions aren't in the token
+        return obj is None and perm in self.scopes
+
+    def has_perms(self, perm_list, obj=None):
+        if not isinstance(perm_list, Iterable) or isinstance(perm_list, str):
+            raise ValueError("perm_list must be an iterable of permissions.")
+
+        return all(self.has_perm(perm, obj) for perm in perm_list)
+
+    def has_module_perms(self, app_label):
+        prefix = app_label + "."
+        return any(scope.startswith(prefix) for scope in self.scopes)
+
+    def get_user(self):
+        """Return the user instance from the database."""
+        if self._user is None:
+            self._user = User.objects.get(pk=self.pk)
+
+        return self._user
+
+    async def aget_user(self):
+        if self._user is None:
+            self._user = await User.objects.aget(pk=self.pk)
+
+        return self._user
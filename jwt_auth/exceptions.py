@@ -4,6 +4,19 @@ from django.utils.translation import gettext as _
 class AuthenticationFailed(Exception):
     status_code = 401
     detail = _("Incorrect authentication credentials.")
+    code = "authentication_failed"
+
+    def __init__(self, detail=None, code=None):
+        super().__init__(self)
+        self.detail = detail or self.detail
+        self.code = code or self.code
+
+    def __str__(self):
+        return self.detail
+
+
+class InvalidRefreshToken(Exception):
+    detail = _("Invalid refresh token.")
 
     def __init__(self, detail=None):
         super().__init__(self)
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.signals import setting_changed
+from django.db import close_old_connections
+from jwt_auth.settings import get_settings
+
+
+class PoolFull(Exception):
+    """Raised when the executor can't accept more jobs."""
+
+
+class BoundedExecutor:
+    """
+    Dedicated thread pool of `max_workers` threads accepting at most
+    `max_queue` pending jobs, a job submitted beyond raises `PoolFull` instead
+    of waiting. Used to run the password hashing of the logins out of the
+    event loop without letting a login storm pile up.
+    """
+
+    def __init__(self, max_workers=4, max_queue=16, thread_name_prefix="jwt-auth"):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix)
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+
+    def submit(self, func, *args, **kwargs):
+        if not self._slots.acquire(blocking=False):
+            raise PoolFull()
+
+        try:
+            future = self._executor.submit(self.call, func, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    async def run(self, func, *args, **kwargs):
+        """Run `func` in the pool and wait for its result."""
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    @staticmethod
+    def call(func, *args, **kwargs):
+        # The connections of the pool threads aren't closed at the end of the
+        # requests
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+_login_executor = None
+_login_executor_lock = threading.Lock()
+
+
+def get_login_executor():
+    """Return the process-wide executor of the logins."""
+    global _login_executor  # pylint: disable=global-statement
+
+    if _login_executor is None:
+        with _login_executor_lock:
+            if _login_executor is None:
+                settings = get_settings()
+                _login_executor = BoundedExecutor(
+                    settings.JWT_LOGIN_MAX_WORKERS,
+                    settings.JWT_LOGIN_MAX_QUEUE,
+                    thread_name_prefix="jwt-auth-login",
+                )
+
+    return _login_executor
+
+
+def reset_login_executor(*args, **kwargs):  # pylint: disable=unused-argument
+    global _login_executor  # pylint: disable=global-statement
+
+    if kwargs.get("setting", "").startswith("JWT_LOGIN_MAX_"):
+        if _login_executor is not None:
+            _login_executor.shutdown()
+        _login_executor = None
+
+
+setting_changed.connect(reset_login_executor, dispatch_uid="jwt_auth_reset_executor")
@@ -0,0 +1,131 @@
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import NoReverseMatch, get_script_prefix, reverse
+
+# Key of the methods exempted by a prefix in the nodes of the trie
+TERMINAL = ""
+
+
+class ExemptionMatcher:
+    """
+    Paths exempted from `RequiredJWTAuthenticationMiddleware`, compiled once
+    so the cost of a lookup doesn't grow with the number of exemptions:
+    exact paths (and reversed URL names) are looked up in a dict, prefixes in
+    a character trie and regexes in one combined pattern per method.
+
+    A rule is either an exact path or a dict with one of the `path`,
+    `prefix`, `regex` (matched from the start of the path) or `name` (URL name
+    reversed without arguments) keys, the paths being relative to the script
+    prefix (`request.path_info`), and optionally `methods`, the list of
+    exempted HTTP methods (all by default). For example:
+
+        ["/token-auth/", {"prefix": "/static/", "methods": ["GET", "HEAD"]}]
+    """
+
+    kinds = ("path", "prefix", "regex", "name")
+
+    def __init__(self, rules):
+        self.paths = {}
+        self.trie = {}
+        self.prefix_depth = 0
+        # Combined regex of the rules exempting all methods (None key) and
+        # by method
+        self.regexes = {}
+
+        regexes = {}
+        for rule in rules:
+            if isinstance(rule, str):
+                rule = {"path": rule}
+
+            kind, value = self.get_kind(rule)
+            methods = rule.get("methods")
+            methods = frozenset(m.upper() for m in methods) if methods else None
+
+            if kind == "path":
+                self.add_path(value, methods)
+            elif kind == "name":
+                try:
+                    self.add_path(self.reverse(value), methods)
+                except NoReverseMatch as error:
+                    raise ImproperlyConfigured(
+                        "Unable to reverse the exempted URL '{0}' (use a regex "
+                        "for the URLs with arguments): {1}".format(value, error)
+                    )
+            elif kind == "prefix":
+                self.add_prefix(value, methods)
+            else:
+                for method in methods or (None,):
+                    regexes.setdefault(method, []).append("(?:{0})".format(value))
+
+        for method, patterns in regexes.items():
+            self.regexes[method] = re.compile("|".join(patterns))
+
+    @staticmethod
+    def reverse(name):
+        # The reversed URL includes the script prefix of the current request (or
+        # FORCE_SCRIPT_NAME), the path info doesn't
+        url = reverse(name)
+        prefix = get_script_prefix()
+        if url.startswith(prefix):
+            url = "/" + url[len(prefix) :]
+        return url
+
+    def get_kind(self, rule):
+        kinds = [kind for kind in self.kinds if kind in rule]
+        if len(kinds) != 1:
+            raise ImproperlyConfigured(
+                "An exempted URL requires one of the {0} keys: {1!r}".format(
+                    ", ".join(self.kinds), rule
+                )
+            )
+
+        return kinds[0], rule[kinds[0]]
+
+    @staticmethod
+    def merge(methods, other):
+        # None (all methods) wins
+        if methods is None or other is None:
+            return None
+
+        return methods | other
+
+    def add_path(self, path, methods):
+        if path in self.paths:
+            methods = self.merge(self.paths[path], methods)
+        self.paths[path] = methods
+
+    def add_prefix(self, prefix, methods):
+        node = self.trie
+        for char in prefix:
+            node = node.setdefault(char, {})
+        if TERMINAL in node:
+            methods = self.merge(node[TERMINAL], methods)
+        node[TERMINAL] = methods
+        self.prefix_depth = max(self.prefix_depth, len(prefix))
+
+    @staticmethod
+    def allows(methods, method):
+        return methods is None or method in methods
+
+    def matches(self, path, method):
+        """Return True if the request on `path` with `method` is exempted."""
+        if path in self.paths and self.allows(self.paths[path], method):
+            return True
+
+        node = self.trie
+        if node:
+            for char in path[: self.prefix_depth]:
+                node = node.get(char)
+                if node is None:
+                    break
+                if TERMINAL in node and self.allows(node[TERMINAL], method):
+                    return True
+
+        if self.regexes:
+            for key in (None, method):
+                regex = self.regexes.get(key)
+                if regex is not None and regex.match(path):
+                    return True
+
+        return False
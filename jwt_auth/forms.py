@@ -3,11 +3,14 @@ from datetime import datetime, timedelta
 from django import forms
 from django.contrib.auth import authenticate
 from django.contrib.auth.signals import user_logged_in
-from django.core.exceptions import ObjectDoesNotExist
+from django.core.cache import cache
 from django.utils.translation import gettext as _
-from jwt_auth import settings as jwt_auth_settings
 from jwt_auth.core import User
-from jwt_auth.utils import jwt_get_user_id_from_payload_handler
+from jwt_auth.exceptions import AuthenticationFailed, InvalidRefreshToken
+from jwt_auth.mixins import get_payload_from_token, get_user, get_user_id_from_payload
+from jwt_auth.refresh_tokens import rotate_refresh_token
+from jwt_auth.settings import get_settings
+from jwt_auth.utils import get_seconds
 
 
 class JSONWebTokenForm(forms.Form):
@@ -54,26 +57,33 @@ class JSONWebTokenRefreshForm(forms.Form):
 
     def clean(self):
         cleaned_data = super(JSONWebTokenRefreshForm, self).clean()
+        token = cleaned_data.get("token")
+        if not token:
+            return cleaned_data
 
-        old_payload = jwt_auth_settings.JWT_DECODE_HANDLER(cleaned_data.get("token"))
-        user_id = jwt_get_user_id_from_payload_handler(old_payload)
-
-        # Verify user
+        # Verified as an authentication token (signature, expiration and
+        # revocation), from the cache of verified tokens if enabled
         try:
-            user = User.objects.get(id=user_id)
-        except ObjectDoesNotExist:
+            old_payload = get_payload_from_token(token)
+            user_id = get_user_id_from_payload(old_payload)
+        except AuthenticationFailed as error:
+            raise forms.ValidationError(str(error))
+
+        # Verify user, through the user cache if enabled
+        user = get_user(user_id)
+        if user is None:
+            if User.objects.filter(pk=user_id).exists():
+                raise forms.ValidationError(_("User account is disabled."))
             raise forms.ValidationError(_("Unable to login with provided credentials."))
 
-        if not user.is_active:
-            raise forms.ValidationError(_("User account is disabled."))
-
         # Verify orig_iat
         orig_iat = old_payload.get("orig_iat")
         if not orig_iat:
             raise forms.ValidationError(_("orig_iat was missing from payload."))
 
         # Verify expiration
-        refresh_limit = jwt_auth_settings.JWT_REFRESH_EXPIRATION_DELTA
+        settings = get_settings()
+        refresh_limit = settings.JWT_REFRESH_EXPIRATION_DELTA
 
         if isinstance(refresh_limit, timedelta):
             refresh_limit = refresh_limit.days * 24 * 3600 + refresh_limit.seconds
@@ -84,7 +94,34 @@ class JSONWebTokenRefreshForm(forms.Form):
         if now_timestamp > expiration_timestamp:
             raise forms.ValidationError(_("Refresh has expired."))
 
+        if settings.JWT_REFRESH_MIN_INTERVAL:
+            # At most one refresh by interval for the tokens of a login
+            key = "jwt_auth:refresh:{0}:{1}".format(user_id, orig_iat)
+            if not cache.add(key, True, get_seconds(settings.JWT_REFRESH_MIN_INTERVAL)):
+                raise forms.ValidationError(_("Token refreshed too recently."))
+
         # Data to re-issue new token. Include original issued at time for a
         # brand new token, to allow token refresh.
         cleaned_data["user"] = user
         cleaned_data["orig_iat"] = orig_iat
+        if settings.JWT_REFRESH_REUSE_CLAIMS:
+            cleaned_data["payload"] = old_payload
+
+
+class RefreshTokenForm(forms.Form):
+    refresh_token = forms.CharField()
+
+    def clean(self):
+        cleaned_data = super(RefreshTokenForm, self).clean()
+        refresh_token = cleaned_data.get("refresh_token")
+        if not refresh_token:
+            return cleaned_data
+
+        try:
+            user, refresh_token = rotate_refresh_token(refresh_token)
+        except InvalidRefreshToken as error:
+            raise forms.ValidationError(str(error))
+
+        # The new access token is issued with the rotated refresh token
+        cleaned_data["user"] = user
+        cleaned_data["refresh_token"] = refresh_token
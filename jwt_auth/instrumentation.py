@@ -0,0 +1,137 @@
+import bisect
+import threading
+from time import perf_counter
+
+# Stages of the authentication of a request
+HEADER = "header"
+DECODE = "decode"
+USER = "user"
+SESSION = "session"
+
+
+def measure(instrument, stage, func, *args):
+    """
+    Call `func`, which returns a `(result, outcome)` pair, and report its
+    duration and outcome to the instrument. The outcome of a failure is the
+    `code` of the raised `AuthenticationFailed`.
+    """
+    start = perf_counter()
+    try:
+        result, outcome = func(*args)
+    except Exception as error:
+        instrument(stage, perf_counter() - start, getattr(error, "code", "error"))
+        raise
+
+    instrument(stage, perf_counter() - start, outcome)
+    return result
+
+
+async def ameasure(instrument, stage, func, *args):
+    """Async counterpart of `measure`, `func` is a coroutine function."""
+    start = perf_counter()
+    try:
+        result, outcome = await func(*args)
+    except Exception as error:
+        instrument(stage, perf_counter() - start, getattr(error, "code", "error"))
+        raise
+
+    instrument(stage, perf_counter() - start, outcome)
+    return result
+
+
+class MetricsAggregator:
+    """
+    In-process instrument aggregating the durations reported by the hot path
+    into one histogram per (stage, outcome), in the manner of a Prometheus
+    client. Set `JWT_INSTRUMENT = "jwt_auth.instrumentation.metrics"` to use
+    the process-wide instance, then expose `metrics.to_prometheus()` or ship
+    `metrics.snapshot()` to StatsD.
+    """
+
+    # Upper bounds in seconds
+    default_buckets = (
+        0.0001,
+        0.00025,
+        0.0005,
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        1.0,
+    )
+
+    def __init__(self, buckets=None):
+        self.buckets = tuple(sorted(buckets or self.default_buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, stage, duration, outcome):
+        index = bisect.bisect_left(self.buckets, duration)
+        with self._lock:
+            series = self._series.get((stage, outcome))
+            if series is None:
+                # count, sum, max, then the count of each bucket and +Inf
+                series = self._series[(stage, outcome)] = [0, 0.0, 0.0] + [0] * (
+                    len(self.buckets) + 1
+                )
+            series[0] += 1
+            series[1] += duration
+            if duration > series[2]:
+                series[2] = duration
+            series[3 + index] += 1
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def snapshot(self):
+        """
+        Return `{stage: {outcome: {"count", "sum", "max", "buckets"}}}`, the
+        buckets being cumulative counts keyed by upper bound.
+        """
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+
+        stages = {}
+        for (stage, outcome), series in items:
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(self.buckets + (float("inf"),), series[3:]):
+                cumulative += count
+                buckets[bound] = cumulative
+            stages.setdefault(stage, {})[outcome] = {
+                "count": series[0],
+                "sum": series[1],
+                "max": series[2],
+                "buckets": buckets,
+            }
+
+        return stages
+
+    def to_prometheus(self, name="jwt_auth_stage_duration_seconds"):
+        """Return the histograms in the Prometheus text exposition format."""
+        lines = [
+            "# HELP {0} Duration of the JWT authentication stages.".format(name),
+            "# TYPE {0} histogram".format(name),
+        ]
+        for stage, outcomes in sorted(self.snapshot().items()):
+            for outcome, series in sorted(outcomes.items()):
+                labels = 'stage="{0}",outcome="{1}"'.format(stage, outcome)
+                for bound, count in series["buckets"].items():
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(
+                        '{0}_bucket{{{1},le="{2}"}} {3}'.format(name, labels, le, count)
+                    )
+                lines.append("{0}_sum{{{1}}} {2!r}".format(name, labels, series["sum"]))
+                lines.append(
+                    "{0}_count{{{1}}} {2}".format(name, labels, series["count"])
+                )
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsAggregator()
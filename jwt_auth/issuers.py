@@ -0,0 +1,158 @@
+import jwt
+from django.core.exceptions import ImproperlyConfigured
+from jwt.utils import base64url_decode
+from jwt_auth import jwks, keys, utils
+
+ISSUER_OPTIONS = frozenset(
+    (
+        "algorithm",
+        "secret_key",
+        "public_key",
+        "jwks_source",
+        "audience",
+        "leeway",
+        "user_id_handler",
+        "scopes_handler",
+    )
+)
+
+
+def peek_issuer(token, codec):
+    """
+    Return the `iss` claim of the token, read without verifying the token so
+    its issuer can be selected before the verification.
+    """
+    try:
+        payload = codec.loads(base64url_decode(token.split(".")[1]))
+    except (IndexError, TypeError, ValueError) as error:
+        raise jwt.DecodeError("Invalid payload padding: {0}".format(error))
+
+    if not isinstance(payload, dict):
+        raise jwt.DecodeError("Invalid payload string: must be a json object")
+
+    return payload.get("iss")
+
+
+class Issuer:
+    """
+    Verification parameters of the tokens of an issuer (`iss` claim), its
+    keys (a static key or a JWKS), algorithms, audience, leeway and the handlers
+    returning the local user ID and scopes of its tokens.
+    """
+
+    __slots__ = (
+        "iss",
+        "algorithms",
+        "verifying_key",
+        "key_set",
+        "audience",
+        "leeway",
+        "get_user_id",
+        "get_scopes",
+    )
+
+    def __init__(
+        self,
+        iss,
+        algorithms,
+        verifying_key=None,
+        key_set=None,
+        audience=None,
+        leeway=0,
+        get_user_id=None,
+        get_scopes=None,
+    ):
+        self.iss = iss
+        self.algorithms = algorithms
+        self.verifying_key = verifying_key
+        self.key_set = key_set
+        self.audience = audience
+        self.leeway = leeway
+        self.get_user_id = get_user_id
+        self.get_scopes = get_scopes
+
+    def get_verifying_key(self, token):
+        """Return the `(key, algorithms)` verifying the token."""
+        if self.key_set is None:
+            return self.verifying_key, self.algorithms
+
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self.key_set.get_verifying_key(kid)
+        if key is None:
+            raise jwt.InvalidSignatureError("Unknown or expired key ID.")
+        return key.verifying_key, key.algorithms
+
+    def map_scopes(self, payload):
+        """
+        Replace the scopes of the payload by the local scopes returned by the
+        scopes handler, the scopes of another issuer are dropped otherwise.
+        """
+        scopes = self.get_scopes(payload) if self.get_scopes is not None else ()
+        payload.pop("scp", None)
+        payload.pop("scope", None)
+        if scopes:
+            payload["scope"] = " ".join(sorted(scopes))
+
+        return payload
+
+    def close(self):
+        if self.key_set is not None:
+            self.key_set.stop()
+
+    @classmethod
+    def from_settings(cls, iss, options, settings):
+        """
+        Build the issuer from its options in the `JWT_ISSUERS` setting, the
+        missing ones default to the settings (`JWT_ALGORITHM`, `JWT_LEEWAY`,
+        the JWKS refresh intervals).
+        """
+        unknown = set(options).difference(ISSUER_OPTIONS)
+        if unknown:
+            raise ImproperlyConfigured(
+                "Unknown options for the JWT issuer '%s': %s."
+                % (iss, ", ".join(sorted(unknown)))
+            )
+
+        algorithm = options.get("algorithm", settings.JWT_ALGORITHM)
+        jwks_source = options.get("jwks_source")
+        if not (jwks_source or options.get("secret_key") or options.get("public_key")):
+            raise ImproperlyConfigured(
+                "The JWT issuer '%s' requires a secret_key, public_key or "
+                "jwks_source." % iss
+            )
+
+        # The subjects of another issuer aren't local user IDs, they must be
+        # mapped explicitly
+        user_id_handler = options.get("user_id_handler")
+        if not user_id_handler:
+            raise ImproperlyConfigured(
+                "The JWT issuer '%s' requires a user_id_handler." % iss
+            )
+        return cls(
+            iss,
+            (algorithm,),
+            verifying_key=(
+                None
+                if jwks_source
+                else keys.load_verifying_key(
+                    algorithm, options.get("secret_key"), options.get("public_key")
+                )
+            ),
+            key_set=(
+                jwks.JWKSProvider(
+                    jwks_source,
+                    settings.JWT_JWKS_REFRESH_INTERVAL,
+                    settings.JWT_JWKS_MIN_REFRESH_INTERVAL,
+                )
+                if jwks_source
+                else None
+            ),
+            audience=options.get("audience"),
+            leeway=options.get("leeway", settings.JWT_LEEWAY),
+            get_user_id=utils.import_from_string(user_id_handler),
+            get_scopes=(
+                utils.import_from_string(options["scopes_handler"])
+                if options.get("scopes_handler")
+                else None
+            ),
+        )
@@ -0,0 +1,163 @@
+import json
+import logging
+import os
+import threading
+import time
+from urllib.request import urlopen
+
+import jwt
+from jwt_auth import utils
+from jwt_auth.keys import Key
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSProvider:
+    """
+    Verification keys loaded from a JSON Web Key Set (file path or HTTP URL),
+    cached in memory and indexed by `kid`.
+
+    The key set is fetched once on first use (see `start`), then refreshed every
+    `refresh_interval` seconds by a background thread so the requests never
+    wait for a fetch. An unknown `kid` triggers a background refresh, at most
+    once every `min_refresh_interval` seconds.
+    """
+
+    def __init__(self, source, refresh_interval=300, min_refresh_interval=30, timeout=5):
+        self.source = source
+        self.refresh_interval = utils.get_seconds(refresh_interval)
+        self.min_refresh_interval = utils.get_seconds(min_refresh_interval)
+        self.timeout = timeout
+        self.keys = {}
+        self.loaded_at = None
+        self._fetched_at = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._schedule_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def age(self):
+        """Age in seconds of the key set, None if never loaded."""
+        if self.loaded_at is None:
+            return None
+
+        return time.time() - self.loaded_at
+
+    def stats(self):
+        return {"keys": len(self.keys), "age": self.age}
+
+    def get_verifying_key(self, kid):
+        """Return the key identified by `kid` or None if unknown."""
+        self.start()
+        key = self.keys.get(kid)
+        if key is None:
+            self.refresh_in_background()
+
+        return key
+
+    def fetch(self):
+        if self.source.startswith(("http://", "https://")):
+            with urlopen(self.source, timeout=self.timeout) as response:
+                return json.load(response)
+
+        with open(self.source, encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def parse(data):
+        keys = {}
+        for jwk_data in data.get("keys", []):
+            if jwk_data.get("use", "sig") != "sig":
+                continue
+
+            try:
+                jwk = jwt.PyJWK(jwk_data)
+            except jwt.PyJWTError as error:
+                logger.warning("Ignoring JWK '%s': %s", jwk_data.get("kid"), error)
+                continue
+
+            keys[jwk.key_id] = Key(jwk.key_id, jwk.algorithm_name, None, jwk.key)
+
+        return keys
+
+    def is_rate_limited(self):
+        return (
+            self._fetched_at is not None
+            and time.monotonic() - self._fetched_at < self.min_refresh_interval
+        )
+
+    def refresh(self, force=False):
+        """
+        Fetch and replace the key set, return False when skipped or failed (the
+        previous keys are kept). A forced refresh is rate-limited.
+        """
+        if force and self.is_rate_limited():
+            return False
+
+        if not self._refresh_lock.acquire(blocking=False):
+            # Already in progress
+            return False
+
+        try:
+            self._fetched_at = time.monotonic()
+            keys = self.parse(self.fetch())
+        except (OSError, ValueError) as error:
+            logger.warning("Unable to load the JWKS from %s: %s", self.source, error)
+            return False
+        finally:
+            self._refresh_lock.release()
+
+        dropped = self.keys.keys() - keys.keys()
+        self.keys = keys
+        self.loaded_at = time.time()
+        if dropped:
+            # The tokens of the dropped keys mustn't be served by the cache
+            # pylint: disable-next=import-outside-toplevel
+            from jwt_auth.cache import clear_token_cache
+
+            clear_token_cache()
+        return True
+
+    def refresh_in_background(self):
+        # The attempt is recorded before the thread starts, so the concurrent
+        # requests with an unknown kid start a single fetch
+        with self._schedule_lock:
+            if self.is_rate_limited():
+                return
+            self._fetched_at = time.monotonic()
+
+        threading.Thread(target=self.refresh, name="jwt-auth-jwks", daemon=True).start()
+
+    def start(self):
+        """
+        Load the key set and start the refresh thread, once per process (the
+        thread doesn't survive a fork). The first load is synchronous, it
+        blocks the first request unless called beforehand (eg. when the
+        application is ready).
+        """
+        if self._pid == os.getpid():
+            return
+
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+
+            if self.loaded_at is None:
+                self.refresh()
+
+            self._stopped.clear()
+            threading.Thread(target=self.run, name="jwt-auth-jwks", daemon=True).start()
+            self._pid = os.getpid()
+
+    def stop(self):
+        self._stopped.set()
+        self._pid = None
+
+    def run(self):
+        while not self._stopped.wait(self.refresh_interval):
+            self.refresh()
@@ -0,0 +1,149 @@
+import time
+from calendar import timegm
+
+from django.core.exceptions import ImproperlyConfigured
+from jwt.algorithms import get_default_algorithms, has_crypto
+from jwt_auth import utils
+
+
+def is_hmac_algorithm(algorithm):
+    return algorithm.startswith("HS")
+
+
+def get_algorithm(algorithm):
+    try:
+        return get_default_algorithms()[algorithm]
+    except KeyError:
+        if not has_crypto:
+            raise ImproperlyConfigured(
+                "The '%s' algorithm requires the 'cryptography' package." % algorithm
+            )
+        raise ImproperlyConfigured("Unsupported JWT algorithm '%s'." % algorithm)
+
+
+def prepare_key(algorithm, key):
+    """
+    Parse the key material (PEM string or bytes) once in the key object used
+    by PyJWT, key objects are returned unchanged.
+    """
+    return get_algorithm(algorithm).prepare_key(key)
+
+
+def load_signing_key(algorithm, secret_key, private_key=None):
+    """
+    Return the key used to sign tokens with `algorithm`, None when an
+    asymmetric algorithm is used without private key (verify-only service).
+    """
+    if is_hmac_algorithm(algorithm):
+        return prepare_key(algorithm, secret_key)
+
+    if not private_key:
+        return None
+
+    return prepare_key(algorithm, private_key)
+
+
+def load_verifying_key(algorithm, secret_key, public_key=None, private_key=None):
+    """
+    Return the key used to verify tokens signed with `algorithm`, the public
+    key is derived from the private key when not provided.
+    """
+    if is_hmac_algorithm(algorithm):
+        return prepare_key(algorithm, secret_key)
+
+    if public_key:
+        return prepare_key(algorithm, public_key)
+
+    if private_key:
+        return prepare_key(algorithm, private_key).public_key()
+
+    raise ImproperlyConfigured(
+        "JWT_PUBLIC_KEY or JWT_PRIVATE_KEY is required by the '%s' algorithm."
+        % algorithm
+    )
+
+
+class Key:
+    """
+    Key of a keyring identified by its `kid`, a retired key still verifies
+    tokens until `expires_at` (timestamp) but it should not sign new ones.
+    """
+
+    __slots__ = (
+        "kid",
+        "algorithm",
+        "algorithms",
+        "signing_key",
+        "verifying_key",
+        "expires_at",
+    )
+
+    def __init__(self, kid, algorithm, signing_key, verifying_key, expires_at=None):
+        self.kid = kid
+        self.algorithm = algorithm
+        self.algorithms = (algorithm,)
+        self.signing_key = signing_key
+        self.verifying_key = verifying_key
+        self.expires_at = expires_at
+
+    def is_expired(self):
+        return self.expires_at is not None and time.time() >= self.expires_at
+
+
+class KeyRing:
+    """
+    Set of keys indexed by `kid`, so the verification key of a token is found
+    in constant time whatever the number of keys.
+    """
+
+    def __init__(self, keys, signing_kid=None):
+        self.keys = {key.kid: key for key in keys}
+        if signing_kid is not None and signing_kid not in self.keys:
+            raise ImproperlyConfigured(
+                "JWT_SIGNING_KID '%s' is not in JWT_KEYRING." % signing_kid
+            )
+        self.signing_key = self.keys.get(signing_kid)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def get_verifying_key(self, kid):
+        """Return the key identified by `kid` or None if unknown or expired."""
+        key = self.keys.get(kid)
+        if key is None or key.is_expired():
+            return None
+
+        return key
+
+    @classmethod
+    def from_settings(cls, keyring, signing_kid, algorithm, grace_period):
+        """
+        Build the keyring from the `JWT_KEYRING` setting, a dict of key options
+        (`algorithm`, `secret_key`, `private_key`, `public_key`, `retired_at`)
+        indexed by `kid`.
+        """
+        grace_period = utils.get_seconds(grace_period)
+        keys = []
+        for kid, options in keyring.items():
+            key_algorithm = options.get("algorithm", algorithm)
+            secret_key = options.get("secret_key")
+            private_key = options.get("private_key")
+            retired_at = options.get("retired_at")
+            keys.append(
+                Key(
+                    kid,
+                    key_algorithm,
+                    load_signing_key(key_algorithm, secret_key, private_key),
+                    load_verifying_key(
+                        key_algorithm,
+                        secret_key,
+                        options.get("public_key"),
+                        private_key,
+                    ),
+                    timegm(retired_at.utctimetuple()) + grace_period
+                    if retired_at
+                    else None,
+                )
+            )
+
+        return cls(keys, signing_kid)
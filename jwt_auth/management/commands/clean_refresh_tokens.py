@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from jwt_auth.refresh_tokens import delete_expired_refresh_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete the expired refresh tokens, by batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        deleted = delete_expired_refresh_tokens(options["batch_size"])
+        if options["verbosity"]:
+            self.stdout.write("Deleted {0} expired refresh tokens.".format(deleted))
@@ -0,0 +1,71 @@
+import csv
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from jwt_auth.bulk import issue_tokens
+from jwt_auth.core import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Issue a token for each of the given users (all the active users by "
+        "default) and write the (user_id, token) pairs as CSV or JSON lines."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "usernames", nargs="*", help="users to issue a token for (default all)"
+        )
+        parser.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+        parser.add_argument(
+            "-o", "--output", help="file to write the tokens to (default stdout)"
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=0,
+            help="number of processes signing the tokens (default none)",
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_active=True)
+        usernames = options["usernames"]
+        if usernames:
+            users = users.filter(**{User.USERNAME_FIELD + "__in": usernames})
+
+        tokens = issue_tokens(
+            users, chunk_size=options["chunk_size"], processes=options["processes"]
+        )
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8", newline="") as f:
+                count = self.write(f, tokens, options["format"])
+        else:
+            count = self.write(self.stdout, tokens, options["format"])
+
+        if usernames and count < len(set(usernames)):
+            raise CommandError(
+                "Issued {0} tokens, some of the users are unknown or inactive.".format(
+                    count
+                )
+            )
+
+        if options["verbosity"] > 1:
+            self.stderr.write("Issued {0} tokens.".format(count))
+
+    @staticmethod
+    def write(f, tokens, output_format):
+        count = 0
+        if output_format == "csv":
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(("user_id", "token"))
+            for user_id, token in tokens:
+                writer.writerow((user_id, token))
+                count += 1
+        else:
+            for user_id, token in tokens:
+                f.write(json.dumps({"user_id": user_id, "token": token}) + "\n")
+                count += 1
+
+        return count
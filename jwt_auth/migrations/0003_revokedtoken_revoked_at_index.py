@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jwt_auth", "0002_refreshtoken"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="revokedtoken",
+            name="revoked_at",
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
@@ -1,62 +1,306 @@
 import jwt
-from django.http import JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware
 from django.utils.decorators import method_decorator
 from django.utils.translation import gettext as _
 from django.views.decorators.csrf import csrf_exempt
-from jwt_auth import exceptions, settings
-from jwt_auth.core import User
-from jwt_auth.utils import get_authorization_header
+from jwt_auth import exceptions, instrumentation
+from jwt_auth.cache import get_token_cache, get_user_cache
+from jwt_auth.codec import json_response
+from jwt_auth.core import TokenUser, User
+from jwt_auth.revocation import get_revocation_store
+from jwt_auth.settings import get_settings
 
-jwt_decode_handler = settings.JWT_DECODE_HANDLER
-jwt_get_user_id_from_payload = settings.JWT_PAYLOAD_GET_USER_ID_HANDLER
 
+def parse_authorization_header(header, prefix):
+    """
+    Return the token (str) of an Authorization header whose scheme matches
+    `prefix` (lowercased), without encoding nor splitting the header.
+    """
+    header = header.strip()
+    length = len(prefix)
+    if header[:length].lower() != prefix or (
+        len(header) > length and not header[length].isspace()
+    ):
+        raise exceptions.AuthenticationFailed(code="missing")
 
-def get_token_from_request(request):
-    auth = get_authorization_header(request).split()
-    auth_header_prefix = settings.JWT_AUTH_HEADER_PREFIX.lower()
-
-    if not auth or auth[0].lower().decode("utf-8") != auth_header_prefix:
-        raise exceptions.AuthenticationFailed()
-
-    if len(auth) == 1:
+    token = header[length:].lstrip()
+    if not token:
         raise exceptions.AuthenticationFailed(
-            _("Invalid Authorization header. No credentials provided.")
+            _("Invalid Authorization header. No credentials provided."),
+            code="invalid_header",
         )
-    elif len(auth) > 2:
+
+    if len(token.split(None, 1)) > 1:
         raise exceptions.AuthenticationFailed(
             _(
                 "Invalid Authorization header. Credentials string "
                 "should not contain spaces."
+            ),
+            code="invalid_header",
+        )
+
+    return token
+
+
+class CSRFCheck(CsrfViewMiddleware):
+    def _reject(self, request, reason):
+        # The reason instead of a response
+        return reason
+
+
+def enforce_csrf(request):
+    """
+    Raise `AuthenticationFailed` when the unsafe request fails the CSRF check,
+    required for the tokens sent automatically by the browsers (cookie).
+    """
+    check = CSRFCheck(lambda request: None)
+    # Populates request.META["CSRF_COOKIE"] used by process_view()
+    check.process_request(request)
+    reason = check.process_view(request, None, (), {})
+    if reason:
+        raise exceptions.AuthenticationFailed(
+            _("CSRF check failed: {0}").format(reason), code="csrf_failed"
+        )
+
+
+def _get_token_from_request(request):
+    settings = get_settings()
+    header = request.META.get("HTTP_AUTHORIZATION")
+    if header:
+        if isinstance(header, bytes):
+            header = header.decode("iso-8859-1")
+        try:
+            return parse_authorization_header(header, settings.AUTH_HEADER_PREFIX), "ok"
+        except exceptions.AuthenticationFailed as error:
+            if error.code != "missing":
+                raise
+
+    # The other sources are only looked up without a JWT Authorization header
+    if settings.JWT_AUTH_COOKIE:
+        token = request.COOKIES.get(settings.JWT_AUTH_COOKIE)
+        if token:
+            # Unlike the header, the cookie is sent by the browser to any site
+            enforce_csrf(request)
+            return token, "cookie"
+
+    if settings.JWT_AUTH_QUERY_PARAM:
+        token = request.GET.get(settings.JWT_AUTH_QUERY_PARAM)
+        if token:
+            return token, "query_param"
+
+    raise exceptions.AuthenticationFailed(code="missing")
+
+
+def get_token_from_request(request):
+    instrument = get_settings().INSTRUMENT
+    if instrument is None:
+        return _get_token_from_request(request)[0]
+
+    return instrumentation.measure(
+        instrument, instrumentation.HEADER, _get_token_from_request, request
+    )
+
+
+def _get_payload_from_token(token):
+    token_cache = get_token_cache()
+    payload = token_cache.get(token) if token_cache is not None else None
+    outcome = "cache_hit"
+
+    if payload is None:
+        try:
+            payload = get_settings().JWT_DECODE_HANDLER(token)
+        except jwt.ExpiredSignatureError:
+            raise exceptions.AuthenticationFailed(
+                _("Signature has expired."), code="expired"
+            )
+        except jwt.InvalidSignatureError:
+            raise exceptions.AuthenticationFailed(
+                _("Error decoding signature."), code="bad_signature"
             )
+        except jwt.InvalidTokenError:
+            raise exceptions.AuthenticationFailed(
+                _("Error decoding signature."), code="invalid_token"
+            )
+
+        if token_cache is not None:
+            token_cache.set(token, payload)
+        outcome = "ok"
+
+    revocation_store = get_revocation_store()
+    if revocation_store is not None and revocation_store.is_revoked(payload):
+        raise exceptions.AuthenticationFailed(
+            _("Token has been revoked."), code="revoked"
         )
 
-    return auth[1]
+    return payload, outcome
 
 
 def get_payload_from_token(token):
-    try:
-        payload = jwt_decode_handler(token)
-    except jwt.ExpiredSignatureError:
-        raise exceptions.AuthenticationFailed(_("Signature has expired."))
-    except jwt.DecodeError:
-        raise exceptions.AuthenticationFailed(_("Error decoding signature."))
+    instrument = get_settings().INSTRUMENT
+    if instrument is None:
+        return _get_payload_from_token(token)[0]
 
-    return payload
+    return instrumentation.measure(
+        instrument, instrumentation.DECODE, _get_payload_from_token, token
+    )
 
 
 def get_user_id_from_payload(payload):
-    user_id = jwt_get_user_id_from_payload(payload)
+    settings = get_settings()
+    get_user_id = settings.JWT_PAYLOAD_GET_USER_ID_HANDLER
+    if settings.ISSUERS and "iss" in payload:
+        # Never the local user ID handler for the tokens of another issuer
+        issuer = settings.ISSUERS.get(payload["iss"])
+        if issuer is not None:
+            get_user_id = issuer.get_user_id
+
+    user_id = get_user_id(payload)
     if not user_id:
-        raise exceptions.AuthenticationFailed(_("Invalid payload"))
+        raise exceptions.AuthenticationFailed(
+            _("Invalid payload"), code="invalid_payload"
+        )
 
     return user_id
 
 
+def _get_user(user_id):
+    user_cache = get_user_cache()
+    if user_cache is not None:
+        user = user_cache.get(user_id)
+        if user is not None:
+            return user, "cache_hit"
+
+    try:
+        user = User.objects.get(pk=user_id, is_active=True)
+    except User.DoesNotExist:
+        return None, "user_inactive"
+
+    if user_cache is not None:
+        user_cache.set(user)
+
+    return user, "ok"
+
+
 def get_user(user_id):
+    return _get_user(user_id)[0]
+
+
+async def _aget_user(user_id):
+    user_cache = get_user_cache()
+    if user_cache is not None:
+        user = await user_cache.aget(user_id)
+        if user is not None:
+            return user, "cache_hit"
+
     try:
-        return User.objects.get(pk=user_id, is_active=True)
+        user = await User.objects.aget(pk=user_id, is_active=True)
     except User.DoesNotExist:
-        return None
+        return None, "user_inactive"
+
+    if user_cache is not None:
+        await user_cache.aset(user)
+
+    return user, "ok"
+
+
+async def aget_user(user_id):
+    return (await _aget_user(user_id))[0]
+
+
+def _get_user_from_payload(payload):
+    user_id = get_user_id_from_payload(payload)
+    settings = get_settings()
+    if settings.JWT_TOKEN_USER:
+        token_user = TokenUser(
+            user_id,
+            payload,
+            settings.JWT_TOKEN_USER_CLAIMS,
+            settings.SCOPES.parse(payload),
+        )
+        return token_user, "token_user"
+
+    return _get_user(user_id)
+
+
+def get_user_from_payload(payload):
+    instrument = get_settings().INSTRUMENT
+    if instrument is None:
+        return _get_user_from_payload(payload)[0]
+
+    return instrumentation.measure(
+        instrument, instrumentation.USER, _get_user_from_payload, payload
+    )
+
+
+async def _aget_user_from_payload(payload):
+    user_id = get_user_id_from_payload(payload)
+    settings = get_settings()
+    if settings.JWT_TOKEN_USER:
+        token_user = TokenUser(
+            user_id,
+            payload,
+            settings.JWT_TOKEN_USER_CLAIMS,
+            settings.SCOPES.parse(payload),
+        )
+        return token_user, "token_user"
+
+    return await _aget_user(user_id)
+
+
+async def aget_user_from_payload(payload):
+    instrument = get_settings().INSTRUMENT
+    if instrument is None:
+        return (await _aget_user_from_payload(payload))[0]
+
+    return await instrumentation.ameasure(
+        instrument, instrumentation.USER, _aget_user_from_payload, payload
+    )
+
+
+def authenticate_request(request):
+    """
+    Return the `(user, token, payload)` of the JWT of the request (the user is
+    None when inactive or unknown), or raise `AuthenticationFailed`.
+
+    The token is verified and the user looked up once per request, the result
+    (or the failure) is kept on the request so the stacked authentication
+    layers (the middlewares and the mixin) share it. The verified token and
+    payload are available as `request.token` and `request.jwt_payload`.
+    """
+    auth = getattr(request, "_jwt_auth", None)
+    if auth is None:
+        try:
+            token = get_token_from_request(request)
+            payload = get_payload_from_token(token)
+            auth = (get_user_from_payload(payload), token, payload)
+            request.token, request.jwt_payload = token, payload
+        except exceptions.AuthenticationFailed as error:
+            auth = error
+        request._jwt_auth = auth
+
+    if isinstance(auth, exceptions.AuthenticationFailed):
+        raise auth
+
+    return auth
+
+
+async def aauthenticate_request(request):
+    """Async counterpart of `authenticate_request`."""
+    auth = getattr(request, "_jwt_auth", None)
+    if auth is None:
+        try:
+            token = get_token_from_request(request)
+            payload = get_payload_from_token(token)
+            auth = (await aget_user_from_payload(payload), token, payload)
+            request.token, request.jwt_payload = token, payload
+        except exceptions.AuthenticationFailed as error:
+            auth = error
+        request._jwt_auth = auth
+
+    if isinstance(auth, exceptions.AuthenticationFailed):
+        raise auth
+
+    return auth
 
 
 class JSONWebTokenAuthMixin:
@@ -68,28 +312,73 @@ class JSONWebTokenAuthMixin:
     `JWT_AUTH_HEADER_PREFIX`. For example:
 
         Authorization: JWT eyJhbGciOiAiSFMyNTYiLCAidHlwIj
+
+    Async views are authenticated by `adispatch` without leaving the event loop.
+
+    The scopes listed by `required_scopes` must be granted by the token (see
+    `JWT_EMBED_SCOPES`), otherwise the response is `403 Forbidden`.
     """
 
     www_authenticate_realm = "api"
+    required_scopes = ()
 
     @method_decorator(csrf_exempt)
     def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self.adispatch(request, *args, **kwargs)
+
         try:
             request.user, request.token = self.authenticate(request)
         except exceptions.AuthenticationFailed as error:
-            response = JsonResponse({"errors": [str(error)]}, status=401)
-            response["WWW-Authenticate"] = self.authenticate_header(request)
+            return self.authentication_failed(request, error)
 
-            return response
+        if self.required_scopes and not self.has_required_scopes(request):
+            return self.permission_denied(request)
 
         return super(JSONWebTokenAuthMixin, self).dispatch(request, *args, **kwargs)
 
+    async def adispatch(self, request, *args, **kwargs):
+        try:
+            request.user, request.token = await self.aauthenticate(request)
+        except exceptions.AuthenticationFailed as error:
+            return self.authentication_failed(request, error)
+
+        if self.required_scopes and not self.has_required_scopes(request):
+            return self.permission_denied(request)
+
+        return await super(JSONWebTokenAuthMixin, self).dispatch(
+            request, *args, **kwargs
+        )
+
     def authenticate(self, request):  # pylint: disable=no-self-use
         """Method required."""
-        token = get_token_from_request(request)
-        payload = get_payload_from_token(token)
-        user_id = get_user_id_from_payload(payload)
-        return get_user(user_id), token
+        user, token, _payload = authenticate_request(request)
+        return user, token
+
+    async def aauthenticate(self, request):  # pylint: disable=no-self-use
+        """Async counterpart of `authenticate`."""
+        user, token, _payload = await aauthenticate_request(request)
+        return user, token
+
+    def has_required_scopes(self, request):
+        """Check `required_scopes` against the scopes of the verified token."""
+        payload = getattr(request, "jwt_payload", None)
+        if payload is None:
+            return False
+
+        return get_settings().SCOPES.has_scopes(payload, self.required_scopes)
+
+    def permission_denied(self, request):  # pylint: disable=unused-argument
+        return json_response(
+            {"errors": [_("The token doesn't grant the required scopes.")]},
+            status=403,
+        )
+
+    def authentication_failed(self, request, error):
+        response = json_response({"errors": [str(error)]}, status=401)
+        response["WWW-Authenticate"] = self.authenticate_header(request)
+
+        return response
 
     def authenticate_header(self, request):
         """
@@ -0,0 +1,54 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class RevokedToken(models.Model):
+    """
+    Revocation of a token (`jti:<jti>` key) or of all the tokens of a user
+    issued before `revoked_at` (`user:<user_id>` key).
+    """
+
+    key = models.CharField(max_length=255, db_index=True)
+    revoked_at = models.DateTimeField(db_index=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.key
+
+    @staticmethod
+    def to_datetime(timestamp):
+        value = datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+        if settings.USE_TZ:
+            return value
+
+        return timezone.make_naive(value)
+
+    def get_timestamp(self, field_name):
+        value = getattr(self, field_name)
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+
+        return value.timestamp()
+
+
+class RefreshToken(models.Model):
+    """
+    Opaque refresh token, only its SHA-256 digest is stored. A token is
+    rotated on use, the tokens issued from the same login share a `family`
+    so the reuse of a rotated token revokes all of them.
+    """
+
+    token_hash = models.CharField(max_length=64, unique=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+"
+    )
+    family = models.CharField(max_length=32, db_index=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(db_index=True)
+    used_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.family
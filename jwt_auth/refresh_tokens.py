@@ -0,0 +1,124 @@
+import hashlib
+import logging
+import secrets
+import uuid
+
+from django.utils import timezone
+from django.utils.translation import gettext as _
+from jwt_auth.exceptions import InvalidRefreshToken
+from jwt_auth.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def hash_token(token):
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def issue_refresh_token(user, family=None):
+    """
+    Return a new opaque refresh token of the user, in a new family unless
+    `family` is given.
+    """
+    # Imported on use, jwt_auth is only required in INSTALLED_APPS with the
+    # refresh tokens
+    from jwt_auth.models import RefreshToken
+
+    token = secrets.token_urlsafe(32)
+    now = timezone.now()
+    RefreshToken.objects.create(
+        token_hash=hash_token(token),
+        user=user,
+        family=family or uuid.uuid4().hex,
+        created_at=now,
+        expires_at=now + get_settings().JWT_REFRESH_TOKEN_LIFETIME,
+    )
+    return token
+
+
+def revoke_family(family):
+    """Revoke all the refresh tokens issued from the same login."""
+    from jwt_auth.models import RefreshToken
+
+    RefreshToken.objects.filter(family=family).delete()
+
+
+def revoke_user_refresh_tokens(user_id):
+    """Revoke all the refresh tokens of the user."""
+    from jwt_auth.models import RefreshToken
+
+    RefreshToken.objects.filter(user_id=user_id).delete()
+
+
+def is_revoked(row):
+    # Issued before a revocation of the tokens of the user, eg. rotated
+    # concurrently with revoke_user()
+    from jwt_auth.revocation import get_revocation_store
+
+    revocation_store = get_revocation_store()
+    if revocation_store is None:
+        return False
+
+    revoked_at = revocation_store.get_user_revocation(row.user_id)
+    return revoked_at is not None and row.created_at.timestamp() <= revoked_at
+
+
+def rotate_refresh_token(token):
+    """
+    Consume the refresh token and return its user and the refresh token
+    replacing it. The reuse of a consumed token revokes its family, the
+    legitimate client and the attacker (one of them replayed a stolen token)
+    have to log in again.
+    """
+    from jwt_auth.models import RefreshToken
+
+    try:
+        row = RefreshToken.objects.select_related("user").get(
+            token_hash=hash_token(token)
+        )
+    except RefreshToken.DoesNotExist:
+        raise InvalidRefreshToken()
+
+    now = timezone.now()
+    if row.expires_at <= now:
+        raise InvalidRefreshToken(_("Refresh token has expired."))
+
+    # Consumed by a conditional update so concurrent uses can't both succeed
+    consumed = RefreshToken.objects.filter(pk=row.pk, used_at__isnull=True).update(
+        used_at=now
+    )
+    if row.used_at is not None or not consumed:
+        logger.warning(
+            "Reuse of a refresh token of user %s, revoking its family", row.user_id
+        )
+        revoke_family(row.family)
+        raise InvalidRefreshToken()
+
+    if is_revoked(row):
+        revoke_family(row.family)
+        raise InvalidRefreshToken()
+
+    if not row.user.is_active:
+        raise InvalidRefreshToken(_("User account is disabled."))
+
+    return row.user, issue_refresh_token(row.user, row.family)
+
+
+def delete_expired_refresh_tokens(batch_size=1000):
+    """
+    Delete the expired refresh tokens by batches of `batch_size` rows (to keep
+    the transactions short), return the number of deleted tokens.
+    """
+    from jwt_auth.models import RefreshToken
+
+    deleted = 0
+    while True:
+        pks = list(
+            RefreshToken.objects.filter(expires_at__lte=timezone.now()).values_list(
+                "pk", flat=True
+            )[:batch_size]
+        )
+        if not pks:
+            return deleted
+
+        deleted += RefreshToken.objects.filter(pk__in=pks).delete()[0]
@@ -0,0 +1,377 @@
+import heapq
+import logging
+import os
+import threading
+import time
+from calendar import timegm
+from datetime import datetime
+
+from django.apps import apps
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.db import close_old_connections
+from jwt_auth.refresh_tokens import revoke_user_refresh_tokens
+from jwt_auth.settings import get_settings
+from jwt_auth.utils import get_seconds, import_from_string
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationIndex:
+    """
+    In-process set of revocation entries sorted by expiration, an entry is
+    pruned as soon as the tokens it revokes would have expired anyway.
+
+    An entry maps a key to the timestamp of the revocation.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._expirations = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the revocation timestamp of the key or None."""
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.time():
+            return None
+
+        return entry[0]
+
+    def add(self, key, revoked_at, expires_at):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if revoked_at <= entry[0] and expires_at <= entry[1]:
+                    # Already known, eg. loaded again by a shared store
+                    return
+                revoked_at = max(revoked_at, entry[0])
+                expires_at = max(expires_at, entry[1])
+            self._entries[key] = (revoked_at, expires_at)
+            heapq.heappush(self._expirations, (expires_at, key))
+            self._prune()
+
+    def prune(self):
+        with self._lock:
+            self._prune()
+
+    def _prune(self):
+        now = time.time()
+        while self._expirations and self._expirations[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expirations)
+            entry = self._entries.get(key)
+            # Skip the superseded expirations of an updated entry
+            if entry is not None and entry[1] <= expires_at:
+                del self._entries[key]
+
+
+class RevocationStore:
+    """
+    Base class of the revocation stores.
+
+    The revocations are checked against the local index only, so the check of a
+    token costs no round trip. The stores shared by several processes
+    implement `save()` and `load()`, the new revocations are then loaded in the
+    index by a background thread every `sync_interval` seconds.
+    """
+
+    shared = True
+
+    def __init__(self, sync_interval=5):
+        self.sync_interval = get_seconds(sync_interval)
+        self.index = RevocationIndex()
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def revoke(self, key, expires_at):
+        """Revoke the key until `expires_at` (timestamp)."""
+        revoked_at = time.time()
+        self.index.add(key, revoked_at, expires_at)
+        if self.shared:
+            self.save(key, revoked_at, expires_at)
+
+    def revoke_token(self, payload):
+        """
+        Revoke the token of the payload until its expiration (and the leeway of
+        its verification).
+        """
+        jti = payload.get("jti")
+        if not jti:
+            raise ValueError("The token can't be revoked without 'jti' claim.")
+
+        expires_at = payload["exp"]
+        if isinstance(expires_at, datetime):
+            expires_at = timegm(expires_at.utctimetuple())
+
+        leeway = get_seconds(get_settings().JWT_LEEWAY)
+        self.revoke("jti:{0}".format(jti), expires_at + leeway)
+
+    def revoke_user(self, user_id):
+        """Revoke all the tokens issued to the user until now."""
+        settings = get_settings()
+        lifetime = get_seconds(settings.JWT_EXPIRATION_DELTA)
+        leeway = get_seconds(settings.JWT_LEEWAY)
+        self.revoke("user:{0}".format(user_id), time.time() + lifetime + leeway)
+
+    def is_revoked(self, payload):
+        self.start()
+        if not self.index:
+            return False
+
+        jti = payload.get("jti")
+        if jti and self.index.get("jti:{0}".format(jti)) is not None:
+            return True
+
+        # The iat claim of the default payload handler has a millisecond
+        # precision, the tokens issued with an integer iat in the second of the
+        # revocation are revoked
+        user_id = get_settings().JWT_PAYLOAD_GET_USER_ID_HANDLER(payload)
+        revoked_at = self.get_user_revocation(user_id)
+        return revoked_at is not None and payload.get("iat", 0) <= revoked_at
+
+    def get_user_revocation(self, user_id):
+        """Return the timestamp of the revocation of the user tokens or None."""
+        self.start()
+        return self.index.get("user:{0}".format(user_id))
+
+    def save(self, key, revoked_at, expires_at):
+        raise NotImplementedError()
+
+    def load(self):
+        """Return the (key, revoked_at, expires_at) revocations not loaded yet."""
+        raise NotImplementedError()
+
+    def sync(self):
+        for key, revoked_at, expires_at in self.load():
+            self.index.add(key, revoked_at, expires_at)
+        self.index.prune()
+
+    def start(self):
+        """Start the sync thread, once per process."""
+        if not self.shared or self._pid == os.getpid():
+            return
+
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+
+            self._stopped.clear()
+            threading.Thread(
+                target=self.run, name="jwt-auth-revocation", daemon=True
+            ).start()
+            self._pid = os.getpid()
+
+    def stop(self):
+        self._stopped.set()
+        self._pid = None
+
+    def run(self):
+        while not self._stopped.wait(self.sync_interval):
+            try:
+                self.sync()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Unable to sync the revoked tokens")
+
+
+class LocalRevocationStore(RevocationStore):
+    """Revocations only known by the current process."""
+
+    shared = False
+
+
+class CacheRevocationStore(RevocationStore):
+    """
+    Revocations shared through a Django cache. Each revocation is stored under
+    a sequence number (an atomic `incr`), so the other processes load the new
+    ones without listing the cache. The entries expire with the tokens.
+
+    The high bits of the sequence numbers are the creation time of the
+    sequence (its generation): when the cache evicts the sequence, the new one
+    doesn't reuse the numbers already loaded by the other processes, they load
+    the new generation from its start.
+    """
+
+    key_prefix = "jwt_auth:revoked:"
+    seq_bits = 32
+    # Origin of the generations, keeps the sequence numbers within 64 bits
+    epoch = 1700000000
+
+    def __init__(self, alias="default", sync_interval=5):
+        super().__init__(sync_interval)
+        self.alias = alias
+        self._loaded_seq = None
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def seq_key(self):
+        return self.key_prefix + "seq"
+
+    def get_first_seq(self, seq):
+        """Return the first sequence number of the generation of `seq`."""
+        return (seq >> self.seq_bits << self.seq_bits) + 1
+
+    def save(self, key, revoked_at, expires_at):
+        generation = int(time.time()) - self.epoch
+        self.cache.add(self.seq_key, generation << self.seq_bits, None)
+        seq = self.cache.incr(self.seq_key)
+        self.cache.set(
+            "{0}{1}".format(self.key_prefix, seq),
+            (key, revoked_at, expires_at),
+            max(1, int(expires_at - time.time()) + 1),
+        )
+
+    def load(self):
+        last_seq = self.cache.get(self.seq_key)
+        if last_seq is None:
+            # Nothing revoked since the creation of the cache or an eviction
+            return []
+
+        first_seq = self.get_first_seq(last_seq)
+        if self._loaded_seq is not None and (
+            first_seq == self.get_first_seq(self._loaded_seq)
+            and last_seq >= self._loaded_seq
+        ):
+            first_seq = self._loaded_seq + 1
+        self._loaded_seq = last_seq
+        if first_seq > last_seq:
+            return []
+
+        entry_keys = [
+            "{0}{1}".format(self.key_prefix, seq)
+            for seq in range(first_seq, last_seq + 1)
+        ]
+        # Expired entries are missing
+        return list(self.cache.get_many(entry_keys).values())
+
+
+class DatabaseRevocationStore(RevocationStore):
+    """
+    Revocations stored by the `RevokedToken` model (`jwt_auth` must be in
+    `INSTALLED_APPS`), the expired rows are deleted every `prune_interval`
+    seconds.
+
+    The new rows are loaded by their revocation time, the rows revoked up to
+    `sync_overlap` seconds before the last loaded one are loaded again: a row
+    committed late (or by a process whose clock is late) isn't skipped.
+    """
+
+    def __init__(self, sync_interval=5, prune_interval=3600, sync_overlap=60):
+        super().__init__(sync_interval)
+        self.prune_interval = get_seconds(prune_interval)
+        self.sync_overlap = get_seconds(sync_overlap)
+        self._loaded_at = None
+        self._pruned_at = time.time()
+
+    @property
+    def model(self):
+        from jwt_auth.models import RevokedToken
+
+        return RevokedToken
+
+    def save(self, key, revoked_at, expires_at):
+        self.model.objects.create(
+            key=key,
+            revoked_at=self.model.to_datetime(revoked_at),
+            expires_at=self.model.to_datetime(expires_at),
+        )
+
+    def load(self):
+        rows = self.model.objects.filter(
+            expires_at__gt=self.model.to_datetime(time.time())
+        )
+        if self._loaded_at is not None:
+            rows = rows.filter(
+                revoked_at__gt=self.model.to_datetime(
+                    self._loaded_at - self.sync_overlap
+                )
+            )
+
+        revocations = [
+            (row.key, row.get_timestamp("revoked_at"), row.get_timestamp("expires_at"))
+            for row in rows.order_by("revoked_at")
+        ]
+        if revocations:
+            self._loaded_at = revocations[-1][1]
+
+        return revocations
+
+    def prune(self):
+        self.model.objects.filter(
+            expires_at__lte=self.model.to_datetime(time.time())
+        ).delete()
+        self._pruned_at = time.time()
+
+    def sync(self):
+        super().sync()
+        if time.time() - self._pruned_at >= self.prune_interval:
+            self.prune()
+
+    def run(self):
+        while not self._stopped.wait(self.sync_interval):
+            try:
+                self.sync()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Unable to sync the revoked tokens")
+            finally:
+                close_old_connections()
+
+
+_revocation_store = None
+
+
+def get_revocation_store():
+    """
+    Return the process-wide revocation store, or None when
+    `JWT_REVOCATION_STORE` is unset.
+    """
+    global _revocation_store  # pylint: disable=global-statement
+
+    settings = get_settings()
+    if _revocation_store is None and settings.JWT_REVOCATION_STORE:
+        store_class = import_from_string(settings.JWT_REVOCATION_STORE)
+        _revocation_store = store_class(**settings.JWT_REVOCATION_STORE_OPTIONS)
+
+    return _revocation_store
+
+
+def get_configured_store():
+    revocation_store = get_revocation_store()
+    if revocation_store is None:
+        raise ImproperlyConfigured("JWT_REVOCATION_STORE is not set.")
+
+    return revocation_store
+
+
+def revoke_token(payload):
+    """Revoke the token of the payload (as returned by the decode handler)."""
+    get_configured_store().revoke_token(payload)
+
+
+def revoke_user(user):
+    """
+    Revoke all the tokens issued to the user ("log out everywhere"), its
+    refresh tokens included.
+    """
+    get_configured_store().revoke_user(user.pk)
+    if apps.is_installed("jwt_auth"):
+        revoke_user_refresh_tokens(user.pk)
+
+
+def reset_revocation_store(*args, **kwargs):  # pylint: disable=unused-argument
+    global _revocation_store  # pylint: disable=global-statement
+
+    if kwargs.get("setting", "").startswith("JWT_REVOCATION_"):
+        if _revocation_store is not None:
+            _revocation_store.stop()
+        _revocation_store = None
+
+
+setting_changed.connect(reset_revocation_store, dispatch_uid="jwt_auth_reset_revocation")
@@ -0,0 +1,76 @@
+import functools
+
+from django.core.exceptions import ImproperlyConfigured
+
+# Bitmasks are kept within the integers supported by all the JSON codecs
+MAX_BITMASK_SCOPES = 64
+
+
+class Scopes:
+    """
+    Encoding of the scopes (eg. the permissions of the user) in the tokens, a
+    space-separated `scope` claim or, when the ordered list of all the scope
+    `names` is given, a bitmask `scp` claim (bit `i` is `names[i]`).
+
+    A claim value is parsed once into a frozenset (the parsed values are
+    cached), and the required scopes of the views are compiled once.
+    """
+
+    def __init__(self, names=None, cache_size=1024):
+        self.names = tuple(names or ())
+        if len(self.names) > MAX_BITMASK_SCOPES:
+            raise ImproperlyConfigured(
+                "JWT_SCOPES accepts at most %d scopes." % MAX_BITMASK_SCOPES
+            )
+
+        self.bits = {name: 1 << index for index, name in enumerate(self.names)}
+        self.parse_value = functools.lru_cache(cache_size)(self._parse_value)
+        self.compile = functools.lru_cache(cache_size)(self._compile)
+
+    def encode(self, scopes):
+        """Return the claims embedding the scopes."""
+        if self.bits:
+            # The scopes missing from the names are dropped
+            mask = 0
+            for scope in scopes:
+                mask |= self.bits.get(scope, 0)
+            return {"scp": mask}
+
+        return {"scope": " ".join(sorted(scopes))}
+
+    def _parse_value(self, value):
+        if isinstance(value, int):
+            return frozenset(name for name, bit in self.bits.items() if value & bit)
+
+        return frozenset(value.split())
+
+    def parse(self, payload):
+        """Return the frozenset of the scopes of the payload."""
+        value = payload.get("scp", payload.get("scope"))
+        if isinstance(value, (int, str)):
+            return self.parse_value(value)
+
+        if isinstance(value, list):
+            # Other issuers may list the scopes
+            return frozenset(scope for scope in value if isinstance(scope, str))
+
+        return frozenset()
+
+    def _compile(self, required):
+        required = frozenset(required)
+        mask = None
+        if required.issubset(self.bits):
+            mask = 0
+            for scope in required:
+                mask |= self.bits[scope]
+
+        return required, mask
+
+    def has_scopes(self, payload, required):
+        """Return whether the payload grants all the `required` scopes."""
+        required, mask = self.compile(tuple(required))
+        value = payload.get("scp")
+        if mask is not None and isinstance(value, int):
+            return value & mask == mask
+
+        return required.issubset(self.parse(payload))
@@ -1,54 +1,301 @@
 import datetime
+import threading
 import warnings
+from functools import cached_property
+from types import MappingProxyType
 
+import jwt
 from django.conf import settings
-from jwt_auth.utils import import_from_string
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from jwt_auth import codec, issuers, jwks, keys, scopes, utils
+from jwt_auth.exemptions import ExemptionMatcher
 
-JWT_ENCODE_HANDLER = import_from_string(
-    getattr(settings, "JWT_ENCODE_HANDLER", "jwt_auth.utils.jwt_encode_handler")
-)
+DEFAULTS = {
+    "JWT_ENCODE_HANDLER": "jwt_auth.utils.jwt_encode_handler",
+    "JWT_DECODE_HANDLER": "jwt_auth.utils.jwt_decode_handler",
+    "JWT_PAYLOAD_HANDLER": "jwt_auth.utils.jwt_payload_handler",
+    "JWT_PAYLOAD_GET_USER_ID_HANDLER": (
+        "jwt_auth.utils.jwt_get_user_id_from_payload_handler"
+    ),
+    "JWT_SCOPES_HANDLER": "jwt_auth.utils.jwt_get_scopes_handler",
+    # Defaults to settings.SECRET_KEY
+    "JWT_SECRET_KEY": None,
+    "JWT_ALGORITHM": "HS256",
+    "JWT_PRIVATE_KEY": None,
+    "JWT_PUBLIC_KEY": None,
+    "JWT_KEYRING": None,
+    "JWT_SIGNING_KID": None,
+    # Defaults to JWT_EXPIRATION_DELTA
+    "JWT_KEYRING_GRACE_PERIOD": None,
+    "JWT_JWKS_SOURCE": None,
+    "JWT_JWKS_REFRESH_INTERVAL": datetime.timedelta(minutes=5),
+    "JWT_JWKS_MIN_REFRESH_INTERVAL": datetime.timedelta(seconds=30),
+    "JWT_ISSUERS": {},
+    "JWT_VERIFY": True,
+    "JWT_VERIFY_EXPIRATION": True,
+    "JWT_LEEWAY": 0,
+    "JWT_EXPIRATION_DELTA": datetime.timedelta(seconds=300),
+    "JWT_ALLOW_REFRESH": False,
+    "JWT_REFRESH_EXPIRATION_DELTA": datetime.timedelta(seconds=300),
+    "JWT_REFRESH_REUSE_CLAIMS": False,
+    "JWT_REFRESH_MIN_INTERVAL": None,
+    "JWT_REFRESH_TOKENS": False,
+    "JWT_REFRESH_TOKEN_LIFETIME": datetime.timedelta(days=14),
+    "JWT_SLIDING_EXPIRATION": None,
+    "JWT_SLIDING_EXPIRATION_HEADER": "X-Refreshed-Token",
+    "JWT_AUTH_HEADER_PREFIX": "Bearer",
+    "JWT_AUTH_COOKIE": None,
+    "JWT_AUTH_QUERY_PARAM": None,
+    "JWT_AUDIENCE": None,
+    "JWT_COMPACT_TOKENS": False,
+    "JWT_COMPACT_CLAIMS": (),
+    "JWT_CLAIM_ALIASES": {},
+    "JWT_EMBED_SCOPES": False,
+    # Ordered names of the scopes encoded as a bitmask
+    "JWT_SCOPES": None,
+    "JWT_LAZY_USER": False,
+    # Defaults to [settings.LOGIN_URL]
+    "JWT_LOGIN_URLS": None,
+    "JWT_EXEMPT_URLS": (),
+    "JWT_LOGIN_MAX_WORKERS": 4,
+    "JWT_LOGIN_MAX_QUEUE": 16,
+    "JWT_LOGIN_RETRY_AFTER": 1,
+    "JWT_LOGIN_THROTTLE_BACKEND": None,
+    "JWT_LOGIN_THROTTLE_BACKEND_OPTIONS": {},
+    "JWT_LOGIN_THROTTLE_RATES": {"ip": "30/min", "username": "5/min"},
+    # META key of the client IP address set by the trusted proxies
+    "JWT_LOGIN_THROTTLE_IP_HEADER": None,
+    "JWT_LOGIN_THROTTLE_TRUSTED_PROXIES": 1,
+    "JWT_TOKEN_CACHE_SIZE": 0,
+    "JWT_TOKEN_CACHE_TTL": datetime.timedelta(seconds=60),
+    "JWT_USER_CACHE": None,
+    "JWT_USER_CACHE_ALIAS": "default",
+    "JWT_USER_CACHE_TTL": datetime.timedelta(seconds=300),
+    "JWT_USER_CACHE_LOCAL_SIZE": 1024,
+    "JWT_USER_CACHE_LOCAL_TTL": datetime.timedelta(seconds=5),
+    "JWT_TOKEN_USER": False,
+    "JWT_TOKEN_USER_CLAIMS": (),
+    "JWT_REVOCATION_STORE": None,
+    "JWT_REVOCATION_STORE_OPTIONS": {},
+    "JWT_INSTRUMENT": None,
+    # Defaults to the json module
+    "JWT_JSON_CODEC": None,
+}
 
-JWT_DECODE_HANDLER = import_from_string(
-    getattr(settings, "JWT_DECODE_HANDLER", "jwt_auth.utils.jwt_decode_handler")
-)
+# Claims validated by PyJWT or read by this package, they can't be renamed to
+# (or from) the aliases
+REGISTERED_CLAIMS = frozenset(("iss", "sub", "aud", "exp", "nbf", "iat", "jti"))
+PACKAGE_CLAIMS = frozenset(("user_id", "email", "username", "orig_iat", "scope", "scp"))
 
-JWT_PAYLOAD_HANDLER = import_from_string(
-    getattr(settings, "JWT_PAYLOAD_HANDLER", "jwt_auth.utils.jwt_payload_handler")
-)
 
-JWT_PAYLOAD_GET_USER_ID_HANDLER = import_from_string(
-    getattr(
-        settings,
-        "JWT_PAYLOAD_GET_USER_ID_HANDLER",
-        "jwt_auth.utils.jwt_get_user_id_from_payload_handler",
+def check_claim_aliases(aliases):
+    """Raise `ImproperlyConfigured` for the aliases corrupting the payloads."""
+    registered = REGISTERED_CLAIMS.intersection(aliases)
+    if registered:
+        raise ImproperlyConfigured(
+            "JWT_CLAIM_ALIASES can't rename the registered claims: %s."
+            % ", ".join(sorted(registered))
+        )
+
+    if len(set(aliases.values())) != len(aliases):
+        raise ImproperlyConfigured("JWT_CLAIM_ALIASES aliases must be unique.")
+
+    colliding = set(aliases.values()) & (
+        REGISTERED_CLAIMS | PACKAGE_CLAIMS | set(aliases)
     )
+    if colliding:
+        raise ImproperlyConfigured(
+            "JWT_CLAIM_ALIASES aliases collide with claim names: %s."
+            % ", ".join(sorted(colliding))
+        )
+
+
+IMPORT_STRINGS = (
+    "JWT_ENCODE_HANDLER",
+    "JWT_DECODE_HANDLER",
+    "JWT_PAYLOAD_HANDLER",
+    "JWT_PAYLOAD_GET_USER_ID_HANDLER",
+    "JWT_SCOPES_HANDLER",
 )
 
-JWT_SECRET_KEY = getattr(settings, "JWT_SECRET_KEY", settings.SECRET_KEY)
 
-JWT_ALGORITHM = getattr(settings, "JWT_ALGORITHM", "HS256")
+class JWTSettings:
+    """
+    Snapshot of the JWT settings resolved from the Django settings, with the
+    objects derived from them (handlers, key objects, decode options) built
+    once so the hot path only reads attributes.
+    """
 
-JWT_VERIFY = getattr(settings, "JWT_VERIFY", True)
+    def __init__(self):
+        for name, default in DEFAULTS.items():
+            value = getattr(settings, name, default)
+            if name in IMPORT_STRINGS:
+                value = utils.import_from_string(value)
+            setattr(self, name, value)
 
-JWT_VERIFY_EXPIRATION = getattr(settings, "JWT_VERIFY_EXPIRATION", True)
+        if self.JWT_SECRET_KEY is None:
+            self.JWT_SECRET_KEY = settings.SECRET_KEY
 
-JWT_LEEWAY = getattr(settings, "JWT_LEEWAY", 0)
+        if self.JWT_KEYRING_GRACE_PERIOD is None:
+            self.JWT_KEYRING_GRACE_PERIOD = self.JWT_EXPIRATION_DELTA
 
-JWT_EXPIRATION_DELTA = getattr(
-    settings, "JWT_EXPIRATION_DELTA", datetime.timedelta(seconds=300)
-)
+        if getattr(settings, "JWT_LOGIN_URL", None):
+            warnings.warn("'JWT_LOGIN_URL' has been replaced by 'JWT_LOGIN_URLS'")
 
-JWT_ALLOW_REFRESH = getattr(settings, "JWT_ALLOW_REFRESH", False)
+        if self.JWT_LOGIN_URLS is None:
+            self.JWT_LOGIN_URLS = [settings.LOGIN_URL]
+
+        self.AUTH_HEADER_PREFIX = self.JWT_AUTH_HEADER_PREFIX.lower()
+
+        # Key objects parsed once
+        self.SIGNING_KEY = keys.load_signing_key(
+            self.JWT_ALGORITHM, self.JWT_SECRET_KEY, self.JWT_PRIVATE_KEY
+        )
+        self.VERIFYING_KEY = keys.load_verifying_key(
+            self.JWT_ALGORITHM,
+            self.JWT_SECRET_KEY,
+            self.JWT_PUBLIC_KEY,
+            self.JWT_PRIVATE_KEY,
+        )
+        self.ALGORITHMS = (self.JWT_ALGORITHM,)
+
+        self.KEYRING = (
+            keys.KeyRing.from_settings(
+                self.JWT_KEYRING,
+                self.JWT_SIGNING_KID,
+                self.JWT_ALGORITHM,
+                self.JWT_KEYRING_GRACE_PERIOD,
+            )
+            if self.JWT_KEYRING
+            else None
+        )
+        self.JWKS = (
+            jwks.JWKSProvider(
+                self.JWT_JWKS_SOURCE,
+                self.JWT_JWKS_REFRESH_INTERVAL,
+                self.JWT_JWKS_MIN_REFRESH_INTERVAL,
+            )
+            if self.JWT_JWKS_SOURCE
+            else None
+        )
+        # Key sets looked up by the kid header of the tokens
+        self.KEY_SETS = tuple(
+            key_set for key_set in (self.KEYRING, self.JWKS) if key_set is not None
+        )
+
+        # Verification parameters of the other issuers indexed by iss
+        self.ISSUERS = MappingProxyType(
+            {
+                iss: issuers.Issuer.from_settings(iss, options, self)
+                for iss, options in self.JWT_ISSUERS.items()
+            }
+        )
+
+        # Callable receiving the duration of each authentication stage
+        self.INSTRUMENT = (
+            utils.import_from_string(self.JWT_INSTRUMENT)
+            if self.JWT_INSTRUMENT
+            else None
+        )
+
+        self.JSON_CODEC = codec.load_codec(self.JWT_JSON_CODEC)
+        # PyJWT API used to encode and decode the tokens
+        if self.JWT_JSON_CODEC is None:
+            self.PYJWT = jwt
+        else:
+            self.PYJWT = codec.CodecPyJWT(self.JSON_CODEC)
+
+        # Claims kept by the compact payload, the user ID being in sub
+        self.COMPACT_CLAIMS = frozenset(("sub", "exp", "iat")).union(
+            self.JWT_COMPACT_CLAIMS
+        )
+        # Short names of the claims in the tokens and their reverse mapping
+        check_claim_aliases(self.JWT_CLAIM_ALIASES)
+        self.CLAIM_ALIASES = MappingProxyType(dict(self.JWT_CLAIM_ALIASES))
+        self.CLAIM_NAMES = MappingProxyType(
+            {alias: name for name, alias in self.CLAIM_ALIASES.items()}
+        )
+        # Encoding and checks of the scopes of the tokens
+        self.SCOPES = scopes.Scopes(self.JWT_SCOPES)
+        if (
+            self.JWT_EMBED_SCOPES
+            and not self.SCOPES.names
+            and self.JWT_SCOPES_HANDLER is utils.jwt_get_scopes_handler
+        ):
+            raise ImproperlyConfigured(
+                "JWT_EMBED_SCOPES requires the list of the embedded JWT_SCOPES."
+            )
+
+        # The algorithm is enough to decode, typ is dropped from compact tokens
+        self.HEADERS = {"typ": None} if self.JWT_COMPACT_TOKENS else None
+
+        self.DECODE_OPTIONS = MappingProxyType(
+            {
+                "verify_signature": self.JWT_VERIFY,
+                "verify_exp": self.JWT_VERIFY_EXPIRATION,
+            }
+        )
+
+    @cached_property
+    def EXEMPTIONS(self):  # pylint: disable=invalid-name
+        # Compiled on first use as the URL names require the URLconf
+        return ExemptionMatcher([*self.JWT_LOGIN_URLS, *self.JWT_EXEMPT_URLS])
+
+    def close(self):
+        if self.JWKS is not None:
+            self.JWKS.stop()
+        for issuer in self.ISSUERS.values():
+            issuer.close()
+
+
+_settings = None
+_settings_lock = threading.Lock()
+
+
+def get_settings():
+    """Return the current snapshot of the JWT settings."""
+    global _settings  # pylint: disable=global-statement
+
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                _settings = JWTSettings()
+
+    return _settings
+
+
+def reload_settings(*args, **kwargs):  # pylint: disable=unused-argument
+    """
+    Discard the snapshot, the next `get_settings()` call resolves the settings
+    again. Connected to `setting_changed` so `override_settings` works.
+    """
+    global _settings  # pylint: disable=global-statement
+
+    setting = kwargs.get("setting")
+    if setting is not None and not (
+        setting.startswith("JWT_") or setting in ("SECRET_KEY", "LOGIN_URL")
+    ):
+        return
+
+    with _settings_lock:
+        if _settings is not None:
+            _settings.close()
+        _settings = None
 
-JWT_REFRESH_EXPIRATION_DELTA = getattr(
-    settings, "JWT_REFRESH_EXPIRATION_DELTA", datetime.timedelta(seconds=300)
-)
 
-JWT_AUTH_HEADER_PREFIX = getattr(settings, "JWT_AUTH_HEADER_PREFIX", "Bearer")
+setting_changed.connect(reload_settings, dispatch_uid="jwt_auth_reload_settings")
 
-JWT_AUDIENCE = getattr(settings, "JWT_AUDIENCE", None)
 
-if getattr(settings, "JWT_LOGIN_URL", None):
-    warnings.warn("'JWT_LOGIN_URL' has been replaced by 'JWT_LOGIN_URLS'")
+def __getattr__(name):
+    # Module attributes (eg. `jwt_auth.settings.JWT_ALGORITHM`) are read from
+    # the current snapshot.
+    if name.startswith("__"):
+        raise AttributeError(name)
 
-JWT_LOGIN_URLS = getattr(settings, "JWT_LOGIN_URLS", [settings.LOGIN_URL])
+    try:
+        return getattr(get_settings(), name)
+    except AttributeError:
+        raise AttributeError(
+            "module '{0}' has no attribute '{1}'".format(__name__, name)
+        ) from None
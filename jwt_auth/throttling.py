@@ -0,0 +1,232 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from jwt_auth.cache import LRUCache
+from jwt_auth.settings import get_settings
+from jwt_auth.utils import import_from_string
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """
+    Return the `(limit, window)` pair of a rate as "<limit>/<period>" where the
+    period is second, minute, hour or day (only the first letter counts),
+    eg. "10/min".
+    """
+    try:
+        limit, period = rate.split("/")
+        return int(limit), PERIODS[period[0].lower()]
+    except (AttributeError, IndexError, KeyError, ValueError):
+        raise ImproperlyConfigured("Invalid throttle rate '{0}'.".format(rate))
+
+
+class CacheThrottleBackend:
+    """
+    Sliding window counter stored in a Django cache (eg. Redis or Memcached,
+    to be shared by the processes). The count of the sliding window is
+    estimated from the counters of the current and previous fixed windows,
+    the latter weighted by its overlap with the sliding window.
+    """
+
+    key_prefix = "jwt_auth:throttle:"
+
+    def __init__(self, alias="default"):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get_window_key(self, key, index):
+        return "{0}{1}:{2:.0f}".format(self.key_prefix, key, index)
+
+    def hit(self, key, limit, window):
+        """
+        Count an attempt, return None when allowed or the number of seconds
+        to wait when the limit is reached (the attempt isn't counted).
+        """
+        wait = self.get_wait(key, limit, window)
+        if wait is None:
+            self.count(key, limit, window)
+
+        return wait
+
+    def get_wait(self, key, limit, window):
+        """
+        Return None when an attempt is allowed or the number of seconds to wait
+        when the limit is reached, without counting the attempt.
+        """
+        index, elapsed = divmod(time.time(), window)
+        current_key = self.get_window_key(key, index)
+        previous_key = self.get_window_key(key, index - 1)
+
+        counts = self.cache.get_many([current_key, previous_key])
+        current = counts.get(current_key, 0)
+        previous = counts.get(previous_key, 0)
+        weight = (window - elapsed) / window
+        if previous * weight + current >= limit:
+            if current >= limit or not previous:
+                return window - elapsed
+            # Until the weight of the previous window is low enough
+            return max(0, window - elapsed - (limit - current) * window / previous)
+
+        return None
+
+    def count(self, key, limit, window):  # pylint: disable=unused-argument
+        """Count an attempt."""
+        current_key = self.get_window_key(key, time.time() // window)
+        # The counter is read as the previous one during the next window
+        self.cache.add(current_key, 0, math.ceil(window * 2))
+        try:
+            self.cache.incr(current_key)
+        except ValueError:
+            # Expired between add and incr
+            self.cache.set(current_key, 1, math.ceil(window * 2))
+
+
+class LocalThrottleBackend:
+    """
+    In-process token buckets of `limit` tokens refilled in `window` seconds,
+    for single process deployments (each process has its own buckets). At most
+    `maxsize` buckets are kept, the least recently used ones being dropped.
+    """
+
+    def __init__(self, maxsize=10000):
+        self.buckets = LRUCache(maxsize)
+        # Reentrant, hit() checks and counts atomically
+        self._lock = threading.RLock()
+
+    def get_tokens(self, key, limit, window, now):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            return limit
+
+        return min(limit, bucket[0] + (now - bucket[1]) * limit / window)
+
+    def hit(self, key, limit, window):
+        """See `CacheThrottleBackend.hit`."""
+        with self._lock:
+            wait = self.get_wait(key, limit, window)
+            if wait is None:
+                self.count(key, limit, window)
+
+        return wait
+
+    def get_wait(self, key, limit, window):
+        """See `CacheThrottleBackend.get_wait`."""
+        with self._lock:
+            tokens = self.get_tokens(key, limit, window, time.time())
+        if tokens < 1:
+            return (1 - tokens) * window / limit
+
+        return None
+
+    def count(self, key, limit, window):
+        """See `CacheThrottleBackend.count`."""
+        now = time.time()
+        with self._lock:
+            tokens = self.get_tokens(key, limit, window, now)
+            # A bucket is full again after `window` seconds
+            self.buckets.set(key, (max(0, tokens - 1), now), now + window)
+
+
+class LoginThrottle:
+    """
+    Limit the login attempts by client IP address and by username. The client
+    IP address is `REMOTE_ADDR`, or read from the `ip_header` of the
+    `META` set by the trusted proxies (eg. "HTTP_X_FORWARDED_FOR"), the entry
+    added by the `trusted_proxies`-th proxy from the application.
+    """
+
+    def __init__(self, backend, rates, ip_header=None, trusted_proxies=1):
+        self.backend = backend
+        self.rates = {scope: parse_rate(rate) for scope, rate in rates.items() if rate}
+        self.ip_header = ip_header
+        self.trusted_proxies = trusted_proxies
+
+    @staticmethod
+    def get_key(scope, value):
+        digest = hashlib.sha256(str(value).encode("utf-8")).hexdigest()[:32]
+        return "{0}:{1}".format(scope, digest)
+
+    def get_client_ip(self, request):
+        if self.ip_header:
+            # Each proxy appends the address of its client, the entries before
+            # the ones of the trusted proxies can be forged
+            entries = request.META.get(self.ip_header, "").split(",")
+            if len(entries) >= self.trusted_proxies:
+                client_ip = entries[-self.trusted_proxies].strip()
+                if client_ip:
+                    return client_ip
+
+        return request.META.get("REMOTE_ADDR")
+
+    def get_idents(self, request, username):
+        idents = {"ip": self.get_client_ip(request)}
+        if isinstance(username, str):
+            idents["username"] = username.lower()
+        return idents
+
+    def check(self, request, username):
+        """
+        Count a login attempt, return None when allowed or the number of
+        seconds to wait before the next attempt. A rejected attempt isn't
+        counted by any scope.
+        """
+        buckets = [
+            (self.get_key(scope, value), *self.rates[scope])
+            for scope, value in self.get_idents(request, username).items()
+            if scope in self.rates and value
+        ]
+
+        waits = [
+            wait
+            for wait in (self.backend.get_wait(*bucket) for bucket in buckets)
+            if wait is not None
+        ]
+        if waits:
+            return max(1, math.ceil(max(waits)))
+
+        for bucket in buckets:
+            self.backend.count(*bucket)
+
+        return None
+
+
+_login_throttle = None
+
+
+def get_login_throttle():
+    """
+    Return the process-wide login throttle, or None when
+    `JWT_LOGIN_THROTTLE_BACKEND` is unset.
+    """
+    global _login_throttle  # pylint: disable=global-statement
+
+    settings = get_settings()
+    if _login_throttle is None and settings.JWT_LOGIN_THROTTLE_BACKEND:
+        backend_class = import_from_string(settings.JWT_LOGIN_THROTTLE_BACKEND)
+        _login_throttle = LoginThrottle(
+            backend_class(**settings.JWT_LOGIN_THROTTLE_BACKEND_OPTIONS),
+            settings.JWT_LOGIN_THROTTLE_RATES,
+            settings.JWT_LOGIN_THROTTLE_IP_HEADER,
+            settings.JWT_LOGIN_THROTTLE_TRUSTED_PROXIES,
+        )
+
+    return _login_throttle
+
+
+def reset_login_throttle(*args, **kwargs):  # pylint: disable=unused-argument
+    global _login_throttle  # pylint: disable=global-statement
+
+    if kwargs.get("setting", "").startswith("JWT_LOGIN_THROTTLE_"):
+        _login_throttle = None
+
+
+setting_changed.connect(reset_login_throttle, dispatch_uid="jwt_auth_reset_throttle")
@@ -1,56 +1,188 @@
-from datetime import datetime
+from calendar import timegm
+from datetime import datetime, timedelta
 import importlib
+import uuid
 
 import jwt
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from jwt_auth import issuers
+from jwt_auth import settings as jwt_auth_settings
 
 
 def jwt_payload_handler(user):
-    from jwt_auth import settings
+    settings = jwt_auth_settings.get_settings()
 
     try:
         username = user.get_username()
     except AttributeError:
         username = user.username
 
-    return {
+    now = datetime.utcnow()
+    payload = {
         "user_id": user.pk,
         "email": user.email,
         "username": username,
-        "exp": datetime.utcnow() + settings.JWT_EXPIRATION_DELTA,
+        "exp": now + settings.JWT_EXPIRATION_DELTA,
+        "iat": get_issued_at(now),
+        "jti": uuid.uuid4().hex,
     }
 
+    if settings.JWT_COMPACT_TOKENS:
+        # The registered sub claim (a string) replaces user_id
+        payload["sub"] = str(payload.pop("user_id"))
+        payload = {
+            name: value
+            for name, value in payload.items()
+            if name in settings.COMPACT_CLAIMS
+        }
+
+    if settings.JWT_EMBED_SCOPES:
+        payload.update(settings.SCOPES.encode(settings.JWT_SCOPES_HANDLER(user)))
+
+    return payload
+
+
+def jwt_refresh_token(payload):
+    """
+    Re-issue the token of a verified payload, only `exp` (and `iat`, `jti` when
+    present) are renewed.
+    """
+    settings = jwt_auth_settings.get_settings()
+    # The payload may be shared by the cache of verified tokens
+    payload = dict(payload)
+    now = datetime.utcnow()
+    payload["exp"] = now + settings.JWT_EXPIRATION_DELTA
+    if "iat" in payload:
+        payload["iat"] = get_issued_at(now)
+    if "jti" in payload:
+        payload["jti"] = uuid.uuid4().hex
+
+    return settings.JWT_ENCODE_HANDLER(payload)
+
+
+def get_issued_at(now):
+    """
+    Return the `iat` claim of a token issued at `now` (naive UTC datetime),
+    truncated to the millisecond: a revocation of the tokens of the user
+    earlier in the same second doesn't revoke the token.
+    """
+    return timegm(now.utctimetuple()) + now.microsecond // 1000 / 1000
+
+
+def jwt_get_scopes_handler(user):
+    """
+    Return the scopes embedded in the tokens of the user, its permissions among
+    `JWT_SCOPES` (queried once at login). The list bounds the size of the
+    tokens, eg. of the superusers having all the permissions.
+    """
+    settings = jwt_auth_settings.get_settings()
+    return [name for name in settings.SCOPES.names if user.has_perm(name)]
+
 
 def jwt_get_user_id_from_payload_handler(payload):
     """
     Override this function if user_id is formatted differently in payload
     """
     user_id = payload.get("user_id")
+    if user_id is None and "sub" in payload:
+        # Compact token, the user ID is converted back from the string
+        pk_field = get_user_model()._meta.pk  # pylint: disable=protected-access
+        try:
+            user_id = pk_field.to_python(payload["sub"])
+        except ValidationError:
+            return None
     return user_id
 
 
-def jwt_encode_handler(payload):
-    from jwt_auth import settings
+def alias_claims(payload, aliases):
+    """Return the payload with the claims renamed by `aliases`."""
+    return {aliases.get(name, name): value for name, value in payload.items()}
 
-    return jwt.encode(payload, settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM)
 
+def jwt_encode_handler(payload):
+    settings = jwt_auth_settings.get_settings()
+
+    if settings.CLAIM_ALIASES:
+        payload = alias_claims(payload, settings.CLAIM_ALIASES)
+
+    if settings.KEYRING is not None and settings.KEYRING.signing_key is not None:
+        key = settings.KEYRING.signing_key
+        headers = {"kid": key.kid}
+        if settings.HEADERS:
+            headers.update(settings.HEADERS)
+        return settings.PYJWT.encode(
+            payload, key.signing_key, key.algorithm, headers=headers
+        )
 
-def jwt_decode_handler(token):
-    from jwt_auth import settings
+    if settings.SIGNING_KEY is None:
+        raise ImproperlyConfigured(
+            "JWT_PRIVATE_KEY is required to sign tokens with '%s'."
+            % settings.JWT_ALGORITHM
+        )
 
-    options = {
-        "verify_exp": settings.JWT_VERIFY_EXPIRATION,
-        "verify": settings.JWT_VERIFY,
-    }
+    return settings.PYJWT.encode(
+        payload, settings.SIGNING_KEY, settings.JWT_ALGORITHM, settings.HEADERS
+    )
 
-    return jwt.decode(
+
+def jwt_decode_handler(token):
+    settings = jwt_auth_settings.get_settings()
+
+    if settings.ISSUERS:
+        iss = issuers.peek_issuer(token, settings.JSON_CODEC)
+        issuer = settings.ISSUERS.get(iss)
+        if issuer is not None:
+            verifying_key, algorithms = issuer.get_verifying_key(token)
+            payload = settings.PYJWT.decode(
+                jwt=token,
+                key=verifying_key,
+                algorithms=algorithms,
+                options=settings.DECODE_OPTIONS,
+                leeway=issuer.leeway,
+                audience=issuer.audience,
+                issuer=iss,
+            )
+            return issuer.map_scopes(payload)
+
+    kid = jwt.get_unverified_header(token).get("kid") if settings.KEY_SETS else None
+    if kid is None and (settings.KEYRING is None or None not in settings.KEYRING.keys):
+        # Tokens signed with JWT_SECRET_KEY or JWT_PRIVATE_KEY have no kid, eg.
+        # with a keyring without JWT_SIGNING_KID
+        verifying_key, algorithms = settings.VERIFYING_KEY, settings.ALGORITHMS
+    else:
+        # Select the verification key by the kid header of the token
+        for key_set in settings.KEY_SETS:
+            key = key_set.get_verifying_key(kid)
+            if key is not None:
+                break
+        else:
+            raise jwt.InvalidSignatureError("Unknown or expired key ID.")
+        verifying_key, algorithms = key.verifying_key, key.algorithms
+
+    payload = settings.PYJWT.decode(
         jwt=token,
-        key=settings.JWT_SECRET_KEY,
-        algorithms=["HS256"],
-        options=options,
+        key=verifying_key,
+        algorithms=algorithms,
+        options=settings.DECODE_OPTIONS,
         leeway=settings.JWT_LEEWAY,
         audience=settings.JWT_AUDIENCE,
     )
 
+    if settings.CLAIM_NAMES:
+        # Back to the full names, the tokens without aliases are unchanged
+        payload = alias_claims(payload, settings.CLAIM_NAMES)
+
+    return payload
+
+
+def get_seconds(delta):
+    """Return the number of seconds of a timedelta or a number."""
+    if isinstance(delta, timedelta):
+        return delta.total_seconds()
+
+    return delta
+
 
 def import_from_string(val):
     """
@@ -1,39 +1,59 @@
-import json
 from datetime import datetime
 
-from django.http import JsonResponse
+from asgiref.sync import sync_to_async
 from django.utils.decorators import method_decorator
 from django.utils.translation import gettext as _
 from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import View
-from jwt_auth import settings as jwt_auth_settings
-from jwt_auth.forms import JSONWebTokenForm, JSONWebTokenRefreshForm
+from jwt_auth.codec import json_response
+from jwt_auth.core import User
+from jwt_auth.executor import PoolFull, get_login_executor
+from jwt_auth.forms import (
+    JSONWebTokenForm,
+    JSONWebTokenRefreshForm,
+    RefreshTokenForm,
+)
+from jwt_auth.refresh_tokens import issue_refresh_token
+from jwt_auth.settings import get_settings
+from jwt_auth.throttling import get_login_throttle
+from jwt_auth.utils import jwt_refresh_token
 
 
 def jwt_encode_token(user, orig_iat=None):
-    payload = jwt_auth_settings.JWT_PAYLOAD_HANDLER(user)
+    settings = get_settings()
+    payload = settings.JWT_PAYLOAD_HANDLER(user)
 
     if orig_iat is None:
-        if jwt_auth_settings.JWT_ALLOW_REFRESH:
+        if settings.JWT_ALLOW_REFRESH:
             # Include original issued at time for a brand new token, to
             # allow token refresh
             payload["orig_iat"] = int(datetime.utcnow().timestamp())
     else:
         payload["orig_iat"] = orig_iat
 
-    return jwt_auth_settings.JWT_ENCODE_HANDLER(payload)
+    return settings.JWT_ENCODE_HANDLER(payload)
 
 
 def jwt_get_json_with_token(token):
+    settings = get_settings()
     return {
-        "token_type": jwt_auth_settings.JWT_AUTH_HEADER_PREFIX,
+        "token_type": settings.JWT_AUTH_HEADER_PREFIX,
         "token": token,
-        "expires_in": jwt_auth_settings.JWT_EXPIRATION_DELTA.total_seconds(),
+        "expires_in": settings.JWT_EXPIRATION_DELTA.total_seconds(),
+    }
+
+
+def jwt_get_json_with_refresh_token(refresh_token):
+    return {
+        "refresh_token": refresh_token,
+        "refresh_expires_in": get_settings().JWT_REFRESH_TOKEN_LIFETIME.total_seconds(),
     }
 
 
 class JSONWebTokenViewBase(View):
     http_method_names = ["post"]
+    # Count the requests against the login throttle, see JWT_LOGIN_THROTTLE_*
+    throttle_logins = False
 
     @method_decorator(csrf_exempt)
     def dispatch(self, request, *args, **kwargs):
@@ -42,33 +62,146 @@ class JSONWebTokenViewBase(View):
     def get_form(self, request_json):
         raise NotImplementedError()
 
-    def post(self, request):
+    def get_request_json(self, request):  # pylint: disable=no-self-use
+        """Return the JSON body of the request or None if invalid."""
         try:
-            request_json = json.loads(request.body.decode("utf-8"))
+            return get_settings().JSON_CODEC.loads(request.body)
         except ValueError:
-            return JsonResponse(
-                {"errors": [_("Improperly formatted request")]}, status=400
-            )
+            return None
+
+    def bad_request(self, errors):  # pylint: disable=no-self-use
+        if isinstance(errors, dict):
+            # Plain lists of str for the codecs unaware of the Django types
+            errors = {field: [str(e) for e in errors[field]] for field in errors}
+        return json_response({"errors": errors}, status=400)
+
+    def get_throttle_wait(self, request, request_json):
+        """
+        Return the number of seconds to wait when the login attempt is
+        throttled, checked before the credentials so a throttled attempt costs
+        no password hashing.
+        """
+        login_throttle = get_login_throttle() if self.throttle_logins else None
+        if login_throttle is None:
+            return None
+
+        username = None
+        if isinstance(request_json, dict):
+            username = request_json.get(User.USERNAME_FIELD)
+
+        return login_throttle.check(request, username)
+
+    def throttled(self, wait):  # pylint: disable=no-self-use
+        response = json_response(
+            {"errors": [_("Too many login attempts, retry later.")]}, status=429
+        )
+        response["Retry-After"] = str(wait)
+        return response
 
-        form = self.get_form(request_json)
-        if not form.is_valid():
-            return JsonResponse({"errors": form.errors}, status=400)
+    def get_token(self, form):  # pylint: disable=no-self-use
+        if form.cleaned_data.get("payload") is not None:
+            return jwt_refresh_token(form.cleaned_data["payload"])
 
-        token = jwt_encode_token(
+        return jwt_encode_token(
             form.cleaned_data["user"], form.cleaned_data.get("orig_iat")
         )
-        return JsonResponse(jwt_get_json_with_token(token))
+
+    def get_response_data(self, form):
+        return jwt_get_json_with_token(self.get_token(form))
+
+    def form_valid(self, form):
+        return json_response(self.get_response_data(form))
+
+    def post(self, request):
+        request_json = self.get_request_json(request)
+        if request_json is None:
+            return self.bad_request([_("Improperly formatted request")])
+
+        wait = self.get_throttle_wait(request, request_json)
+        if wait is not None:
+            return self.throttled(wait)
+
+        form = self.get_form(request_json)
+        if not form.is_valid():
+            return self.bad_request(form.errors)
+
+        return self.form_valid(form)
 
 
 class JSONWebToken(JSONWebTokenViewBase):
+    throttle_logins = True
+
     def get_form(self, request_json):
         return JSONWebTokenForm(request_json)
 
+    def get_response_data(self, form):
+        data = super(JSONWebToken, self).get_response_data(form)
+        if get_settings().JWT_REFRESH_TOKENS:
+            refresh_token = issue_refresh_token(form.cleaned_data["user"])
+            data.update(jwt_get_json_with_refresh_token(refresh_token))
+
+        return data
+
 
 class RefreshJSONWebToken(JSONWebTokenViewBase):
     def get_form(self, request_json):
         return JSONWebTokenRefreshForm(request_json)
 
 
+class RefreshTokenPair(JSONWebTokenViewBase):
+    """
+    Exchange a refresh token (see `JWT_REFRESH_TOKENS`) for a new access token
+    and a new refresh token, the used one can't be used again.
+    """
+
+    def get_form(self, request_json):
+        return RefreshTokenForm(request_json)
+
+    def get_response_data(self, form):
+        data = super(RefreshTokenPair, self).get_response_data(form)
+        data.update(jwt_get_json_with_refresh_token(form.cleaned_data["refresh_token"]))
+        return data
+
+
+class AsyncJSONWebToken(JSONWebToken):
+    """
+    Async variant of `JSONWebToken` for ASGI deployments. The credentials are
+    checked (password hashing) by a dedicated pool of
+    `JWT_LOGIN_MAX_WORKERS` threads, so the logins never block the event
+    loop. When `JWT_LOGIN_MAX_QUEUE` logins are already waiting, the request
+    is rejected with a 503 response.
+    """
+
+    async def post(self, request):
+        request_json = self.get_request_json(request)
+        if request_json is None:
+            return self.bad_request([_("Improperly formatted request")])
+
+        wait = await sync_to_async(self.get_throttle_wait)(request, request_json)
+        if wait is not None:
+            return self.throttled(wait)
+
+        form = self.get_form(request_json)
+        try:
+            is_valid = await get_login_executor().run(form.is_valid)
+        except PoolFull:
+            return self.service_unavailable()
+
+        if not is_valid:
+            return self.bad_request(form.errors)
+
+        # The refresh token is stored in the database
+        return await sync_to_async(self.form_valid)(form)
+
+    def service_unavailable(self):  # pylint: disable=no-self-use
+        response = json_response(
+            {"errors": [_("Too many login requests, retry later.")]}, status=503
+        )
+        response["Retry-After"] = str(get_settings().JWT_LOGIN_RETRY_AFTER)
+        return response
+
+
 jwt_token = JSONWebToken.as_view()
+async_jwt_token = AsyncJSONWebToken.as_view()
 refresh_jwt_token = RefreshJSONWebToken.as_view()
+refresh_token_pair = RefreshTokenPair.as_view()
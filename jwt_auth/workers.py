@@ -0,0 +1,23 @@
+"""
+Entry points of the processes signing the tokens of `jwt_auth.bulk`. The
+module doesn't import the models: the processes started by the "spawn" and
+"forkserver" methods import it before Django is set up.
+"""
+import django
+from django.apps import apps
+
+
+def setup_worker():
+    # Required by the "spawn" and "forkserver" start methods, the forked
+    # workers are ready
+    if not apps.ready:
+        django.setup()
+
+
+def sign_payloads(payloads):
+    """Return the tokens of the (user_id, payload) pairs."""
+    # pylint: disable=import-outside-toplevel
+    from jwt_auth.settings import get_settings
+
+    encode = get_settings().JWT_ENCODE_HANDLER
+    return [(user_id, encode(payload)) for user_id, payload in payloads]
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Benchmarks of the authentication hot path.
+
+    ./runbenchmarks.py --save benchmarks/baseline.json
+    ./runbenchmarks.py --compare
+
+Exits with status 1 when a benchmark regresses against the baseline, and with
+status 2 when the comparison is requested without baseline.
+"""
+import argparse
+import os
+import sys
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+APP_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, APP_DIR)
+
+DEFAULT_BASELINE = os.path.join(APP_DIR, "benchmarks", "baseline.json")
+
+
+def run_benchmarks():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("names", nargs="*", help="benchmarks to run (default all)")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="exit with an error when a benchmark regresses against the baseline",
+    )
+    parser.add_argument(
+        "--save", metavar="PATH", help="save the results as new baseline"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed throughput drop against the baseline (default 0.2)",
+    )
+    args = parser.parse_args()
+
+    from benchmarks import runner
+
+    baseline = runner.load_baseline(args.baseline)
+    if args.compare and baseline is None:
+        # Checked before running, a comparison without baseline never fails
+        parser.error(
+            "no baseline at {0}, save one with --save first".format(args.baseline)
+        )
+
+    import django
+    from django.test.utils import setup_test_environment
+
+    django.setup()
+    setup_test_environment()
+
+    from django.db import connection
+
+    connection.creation.create_test_db(verbosity=0)
+
+    # Register the benchmarks
+    import benchmarks.auth  # noqa: F401 pylint: disable=unused-import
+
+    results = runner.run(args.iterations, args.warmup, args.names)
+    print(runner.format_results(results, baseline))
+
+    if args.save:
+        runner.save_baseline(args.save, results)
+        return 0
+
+    if args.compare:
+        regressions = runner.compare(results, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions:\n" + "\n".join(regressions))
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_benchmarks())
@@ -33,7 +33,12 @@ setup(
     # Original author is "Jose Padilla <hello@jpadilla.com>"
     author="Stéphane Raimbault",
     author_email="stephane.raimbault@webstack.fr",
-    packages=["jwt_auth"],
+    packages=[
+        "jwt_auth",
+        "jwt_auth.management",
+        "jwt_auth.management.commands",
+        "jwt_auth.migrations",
+    ],
     test_suite="runtests.run_tests",
     classifiers=[
         "Development Status :: 5 - Production/Stable",
@@ -46,5 +51,9 @@ setup(
         "Programming Language :: Python :: 3",
         "Topic :: Internet :: WWW/HTTP",
     ],
-    install_requires=["Django>=3.0", "PyJWT>=2.0.0"],
+    install_requires=["Django>=4.2", "PyJWT>=2.0.0"],
+    extras_require={
+        "crypto": ["PyJWT[crypto]>=2.0.0"],
+        "orjson": ["orjson>=3.0"],
+    },
 )
@@ -0,0 +1,112 @@
+import json
+import multiprocessing
+from io import StringIO
+
+from django.contrib.auth.models import Group, Permission
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from jwt_auth import bulk, utils
+from jwt_auth.core import User
+
+
+class IssueTokensTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(
+                "user{0}".format(i), "user{0}@example.com".format(i)
+            )
+            for i in range(5)
+        ]
+
+    def assertValidTokens(self, tokens):  # pylint: disable=invalid-name
+        self.assertEqual([user_id for user_id, _ in tokens], [u.pk for u in self.users])
+        for user_id, token in tokens:
+            self.assertEqual(utils.jwt_decode_handler(token)["user_id"], user_id)
+
+    def test_queryset(self):
+        # A query by chunk, then an empty one
+        with self.assertNumQueries(4):
+            tokens = list(bulk.issue_tokens(User.objects.all(), chunk_size=2))
+
+        self.assertValidTokens(tokens)
+
+    def test_only_fields(self):
+        chunk = next(bulk.iter_chunks(User.objects.all(), 10))
+        self.assertEqual(
+            chunk[0].get_deferred_fields(),
+            {f.attname for f in User._meta.concrete_fields}
+            - {"id", "username", "email"},
+        )
+
+    @override_settings(JWT_EMBED_SCOPES=True, JWT_SCOPES=["auth.view_user"])
+    def test_scopes_without_query_by_user(self):
+        permission = Permission.objects.get(codename="view_user")
+        self.users[1].user_permissions.add(permission)
+        group = Group.objects.create(name="readers")
+        group.permissions.add(permission)
+        self.users[3].groups.add(group)
+
+        # A query by chunk and its permissions, then an empty one
+        with self.assertNumQueries(4):
+            tokens = list(bulk.issue_tokens(User.objects.all(), chunk_size=10))
+
+        self.assertEqual(
+            [utils.jwt_decode_handler(token)["scp"] for _, token in tokens],
+            [0, 1, 0, 1, 0],
+        )
+
+    def test_iterable(self):
+        with self.assertNumQueries(0):
+            tokens = list(bulk.issue_tokens(iter(self.users), chunk_size=2))
+
+        self.assertValidTokens(tokens)
+
+    @override_settings(JWT_ALLOW_REFRESH=True)
+    def test_orig_iat(self):
+        tokens = list(bulk.issue_tokens(self.users[:2]))
+        payloads = [utils.jwt_decode_handler(token) for _, token in tokens]
+        self.assertEqual(payloads[0]["orig_iat"], payloads[1]["orig_iat"])
+
+    def test_processes(self):
+        tokens = list(bulk.issue_tokens(self.users, chunk_size=1, processes=2))
+        self.assertValidTokens(tokens)
+
+    def test_spawned_processes(self):
+        # The workers import the entry points before setting up Django
+        tokens = list(
+            bulk.issue_tokens(
+                self.users,
+                chunk_size=2,
+                processes=2,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        )
+        self.assertValidTokens(tokens)
+
+
+class IssueTokensCommandTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("foo", "foo@example.com")
+        User.objects.create_user("bar", "bar@example.com", is_active=False)
+
+    def test_csv(self):
+        stdout = StringIO()
+        call_command("issue_jwt_tokens", stdout=stdout)
+
+        header, row = stdout.getvalue().splitlines()
+        self.assertEqual(header, "user_id,token")
+        user_id, token = row.split(",")
+        self.assertEqual(int(user_id), self.user.pk)
+        self.assertEqual(utils.jwt_decode_handler(token)["user_id"], self.user.pk)
+
+    def test_jsonl(self):
+        stdout = StringIO()
+        call_command("issue_jwt_tokens", "foo", format="jsonl", stdout=stdout)
+
+        line = json.loads(stdout.getvalue())
+        self.assertEqual(line["user_id"], self.user.pk)
+
+    def test_unknown_user(self):
+        with self.assertRaises(CommandError):
+            call_command("issue_jwt_tokens", "foo", "bar", stdout=StringIO())
@@ -0,0 +1,150 @@
+import time
+from unittest import mock
+
+from django.shortcuts import reverse
+from django.test import TestCase, override_settings
+from django.test.client import Client
+from jwt_auth import cache, mixins, utils
+from jwt_auth.cache import UserCache, VerifiedTokenCache
+from jwt_auth.core import User
+from jwt_auth.jwks import JWKSProvider
+
+
+class VerifiedTokenCacheTestCase(TestCase):
+    def test_hit_and_miss(self):
+        token_cache = VerifiedTokenCache(10)
+        payload = {"user_id": 1, "exp": time.time() + 60}
+
+        self.assertIsNone(token_cache.get("abc"))
+        token_cache.set("abc", payload)
+        self.assertEqual(token_cache.get("abc"), payload)
+        self.assertEqual(token_cache.stats()["hits"], 1)
+        self.assertEqual(token_cache.stats()["misses"], 1)
+
+    def test_lru_eviction(self):
+        token_cache = VerifiedTokenCache(2)
+        exp = time.time() + 60
+        token_cache.set("a", {"exp": exp})
+        token_cache.set("b", {"exp": exp})
+        # Touch "a" so "b" is the least recently used entry
+        token_cache.get("a")
+        token_cache.set("c", {"exp": exp})
+
+        self.assertEqual(len(token_cache), 2)
+        self.assertIsNotNone(token_cache.get("a"))
+        self.assertIsNone(token_cache.get("b"))
+
+    def test_expired_entry(self):
+        token_cache = VerifiedTokenCache(10)
+        token_cache.set("a", {"exp": time.time() - 1})
+        self.assertIsNone(token_cache.get("a"))
+
+        token_cache = VerifiedTokenCache(10, ttl=-1)
+        token_cache.set("a", {"exp": time.time() + 60})
+        self.assertIsNone(token_cache.get("a"))
+
+    def test_no_expiration(self):
+        token_cache = VerifiedTokenCache(10)
+        token_cache.set("a", {"user_id": 1})
+        self.assertEqual(len(token_cache), 0)
+
+
+class TokenCacheMixinTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("foo", "foo@example.com", "password")
+        self.client = Client()
+        self.protected_url = reverse("protected")
+
+    def test_verified_once(self):
+        token = utils.jwt_encode_handler(utils.jwt_payload_handler(self.user))
+        auth = "Bearer {0}".format(token)
+
+        with mock.patch.object(cache, "_token_cache", VerifiedTokenCache(10)):
+            for _ in range(3):
+                response = self.client.get(self.protected_url, HTTP_AUTHORIZATION=auth)
+                self.assertEqual(response.status_code, 200)
+
+            stats = cache.get_token_cache().stats()
+
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 2)
+
+
+    @override_settings(JWT_TOKEN_CACHE_SIZE=10)
+    def test_cleared_on_key_change(self):
+        token = utils.jwt_encode_handler(utils.jwt_payload_handler(self.user))
+        auth = "Bearer {0}".format(token)
+        response = self.client.get(self.protected_url, HTTP_AUTHORIZATION=auth)
+        self.assertEqual(response.status_code, 200)
+
+        with override_settings(JWT_SECRET_KEY="another-secret-key-of-32-bytes!!"):
+            response = self.client.get(self.protected_url, HTTP_AUTHORIZATION=auth)
+        self.assertEqual(response.status_code, 401)
+
+    def test_cleared_on_dropped_jwks_key(self):
+        token_cache = VerifiedTokenCache(10)
+        token_cache.set("token", {"exp": time.time() + 60})
+        provider = JWKSProvider("/nonexistent/jwks.json")
+        provider.keys = {"old": None}
+
+        with mock.patch.object(cache, "_token_cache", token_cache):
+            with mock.patch.object(provider, "fetch", return_value={"keys": []}):
+                self.assertTrue(provider.refresh())
+
+        self.assertIsNone(token_cache.get("token"))
+
+
+class UserCacheTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("foo", "foo@example.com", "password")
+        self.user_cache = UserCache()
+        self.patcher = mock.patch.object(cache, "_user_cache", self.user_cache)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.user_cache.delete(self.user.pk)
+        self.patcher.stop()
+
+    def test_no_query_when_cached(self):
+        self.assertEqual(mixins.get_user(self.user.pk), self.user)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(mixins.get_user(self.user.pk), self.user)
+
+        # Served by the Django cache
+        self.user_cache.local.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(mixins.get_user(self.user.pk), self.user)
+
+    def test_invalidation_on_save(self):
+        mixins.get_user(self.user.pk)
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertIsNone(self.user_cache.get(self.user.pk))
+        self.assertIsNone(mixins.get_user(self.user.pk))
+
+    def test_invalidation_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.user.is_active = False
+            self.user.save()
+            # Cached again before the commit, eg. by a concurrent request
+            self.user_cache.set(User.objects.get(pk=self.user.pk))
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertIsNone(self.user_cache.get(self.user.pk))
+
+    def test_invalidation_on_delete(self):
+        mixins.get_user(self.user.pk)
+        user_id = self.user.pk
+        self.user.delete()
+
+        self.assertIsNone(mixins.get_user(user_id))
+
+    def test_returns_copy(self):
+        mixins.get_user(self.user.pk)
+        user = mixins.get_user(self.user.pk)
+        user.username = "bar"
+
+        self.assertEqual(mixins.get_user(self.user.pk).username, "foo")
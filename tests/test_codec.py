@@ -0,0 +1,130 @@
+import json
+import unittest
+
+import jwt
+from django.core.exceptions import ImproperlyConfigured
+from django.shortcuts import reverse
+from django.test import TestCase, override_settings
+from django.test.client import Client
+from jwt_auth import utils
+from jwt_auth.codec import CodecPyJWT, StdlibJSONCodec, load_codec
+from jwt_auth.core import User
+from jwt_auth.settings import get_settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class RecordingCodec:
+    """Stdlib codec recording its calls."""
+
+    calls = []
+
+    @classmethod
+    def dumps(cls, obj):
+        cls.calls.append("dumps")
+        return json.dumps(obj).encode("utf-8")
+
+    @classmethod
+    def loads(cls, data):
+        cls.calls.append("loads")
+        return json.loads(data)
+
+
+CODEC = "tests.test_codec.RecordingCodec"
+
+
+class LoadCodecTestCase(TestCase):
+    def test_default(self):
+        self.assertIs(load_codec(None), StdlibJSONCodec)
+        self.assertIs(get_settings().PYJWT, jwt)
+
+    def test_module_or_object(self):
+        self.assertIs(load_codec("json"), json)
+        self.assertIs(load_codec(CODEC), RecordingCodec)
+        self.assertIs(load_codec(RecordingCodec), RecordingCodec)
+
+    def test_not_installed(self):
+        for codec in ("not_installed_json", "tests.test_codec.Missing"):
+            with self.assertRaisesRegex(ImproperlyConfigured, "orjson"):
+                load_codec(codec)
+
+    @override_settings(JWT_JSON_CODEC=CODEC)
+    def test_settings(self):
+        settings = get_settings()
+        self.assertIs(settings.JSON_CODEC, RecordingCodec)
+        self.assertIsInstance(settings.PYJWT, CodecPyJWT)
+
+
+@override_settings(JWT_JSON_CODEC=CODEC)
+class CodecTestCase(TestCase):
+    def setUp(self):
+        RecordingCodec.calls = []
+        self.user = User.objects.create_user(
+            email="foo@example.com", password="password", username="foo"
+        )
+        self.client = Client()
+
+    def test_claims(self):
+        token = utils.jwt_encode_handler(utils.jwt_payload_handler(self.user))
+        self.assertEqual(RecordingCodec.calls, ["dumps"])
+        # The tokens are compatible with the default codec
+        with override_settings(JWT_JSON_CODEC=None):
+            payload = utils.jwt_decode_handler(token)
+        self.assertEqual(payload["user_id"], self.user.pk)
+
+        RecordingCodec.calls = []
+        self.assertEqual(utils.jwt_decode_handler(token), payload)
+        self.assertEqual(RecordingCodec.calls, ["loads"])
+
+    def test_invalid_payload(self):
+        token = jwt.api_jws.encode(b"[1]", "dont-tell-eve", "HS256")
+        with self.assertRaisesRegex(jwt.DecodeError, "must be a json object"):
+            utils.jwt_decode_handler(token)
+
+    def test_login(self):
+        response = self.client.post(
+            reverse("auth_token"),
+            json.dumps({"username": "foo", "password": "password"}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("token", response.json())
+        self.assertEqual(RecordingCodec.calls, ["loads", "dumps", "dumps"])
+
+    def test_form_errors(self):
+        response = self.client.post(
+            reverse("auth_token"),
+            json.dumps({"username": "foo"}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["errors"]["password"], ["This field is required."]
+        )
+
+
+@unittest.skipUnless(orjson, "orjson is not installed")
+@override_settings(JWT_JSON_CODEC="orjson")
+class OrjsonCodecTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="foo@example.com", password="password", username="foo"
+        )
+
+    def test_round_trip(self):
+        token = utils.jwt_encode_handler(utils.jwt_payload_handler(self.user))
+        self.assertEqual(utils.jwt_decode_handler(token)["user_id"], self.user.pk)
+
+        response = Client().post(
+            reverse("auth_token"),
+            json.dumps({"username": "foo", "password": "password"}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            utils.jwt_decode_handler(response.json()["token"])["user_id"],
+            self.user.pk,
+        )
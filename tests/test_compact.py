@@ -0,0 +1,115 @@
+import datetime
+import json
+
+import jwt
+from django.core.exceptions import ImproperlyConfigured
+from django.shortcuts import reverse
+from django.test import TestCase, modify_settings, override_settings
+from django.test.client import Client
+from jwt_auth import utils
+from jwt_auth.core import User
+from jwt_auth.settings import get_settings
+
+
+@override_settings(JWT_COMPACT_TOKENS=True)
+class CompactTokenTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="foo@example.com", password="password", username="foo"
+        )
+        self.client = Client()
+
+    def get_token(self):
+        return utils.jwt_encode_handler(utils.jwt_payload_handler(self.user))
+
+    def test_payload(self):
+        token = self.get_token()
+        self.assertEqual(jwt.get_unverified_header(token), {"alg": "HS256"})
+
+        payload = utils.jwt_decode_handler(token)
+        self.assertEqual(set(payload), {"sub", "exp", "iat"})
+        self.assertEqual(payload["sub"], str(self.user.pk))
+        get_user_id = utils.jwt_get_user_id_from_payload_handler
+        self.assertEqual(get_user_id(payload), self.user.pk)
+        self.assertIsNone(get_user_id({"sub": "foo"}))
+
+        # Shorter than the default token
+        with override_settings(JWT_COMPACT_TOKENS=False):
+            self.assertLess(len(token), len(self.get_token()))
+
+    @override_settings(JWT_COMPACT_CLAIMS=("jti", "username"))
+    def test_extra_claims(self):
+        payload = utils.jwt_decode_handler(self.get_token())
+        self.assertEqual(set(payload), {"sub", "exp", "iat", "jti", "username"})
+
+    @override_settings(JWT_CLAIM_ALIASES={"orig_iat": "oi", "username": "u"})
+    def test_aliases(self):
+        token = utils.jwt_encode_handler(
+            {"user_id": 1, "orig_iat": 2, "username": "foo"}
+        )
+        self.assertEqual(
+            jwt.decode(token, options={"verify_signature": False}),
+            {"user_id": 1, "oi": 2, "u": "foo"},
+        )
+        self.assertEqual(
+            utils.jwt_decode_handler(token),
+            {"user_id": 1, "orig_iat": 2, "username": "foo"},
+        )
+
+    @override_settings(JWT_CLAIM_ALIASES={"orig_iat": "oi", "username": "u"})
+    def test_aliased_token_expired(self):
+        past = datetime.datetime.utcnow() - datetime.timedelta(seconds=60)
+        token = utils.jwt_encode_handler({"sub": "1", "exp": past, "orig_iat": 1})
+        with self.assertRaises(jwt.ExpiredSignatureError):
+            utils.jwt_decode_handler(token)
+
+    def test_invalid_aliases(self):
+        for aliases in (
+            {"exp": "e"},
+            {"iss": "i"},
+            {"email": "exp"},
+            {"email": "e", "username": "e"},
+            {"email": "username"},
+            {"email": "e", "e": "f"},
+        ):
+            with self.subTest(aliases=aliases):
+                with override_settings(JWT_CLAIM_ALIASES=aliases):
+                    with self.assertRaises(ImproperlyConfigured):
+                        get_settings()
+
+    def test_mixin(self):
+        response = self.client.get(
+            reverse("protected"), HTTP_AUTHORIZATION="Bearer " + self.get_token()
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["username"], "foo")
+
+    @modify_settings(
+        MIDDLEWARE={"append": "jwt_auth.middleware.JWTAuthenticationMiddleware"}
+    )
+    def test_middleware(self):
+        response = self.client.get(
+            reverse("plain"), HTTP_AUTHORIZATION="Bearer " + self.get_token()
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["username"], "foo")
+
+    @override_settings(JWT_ALLOW_REFRESH=True, JWT_CLAIM_ALIASES={"orig_iat": "oi"})
+    def test_refresh(self):
+        response = self.client.post(
+            reverse("auth_token"),
+            json.dumps({"username": "foo", "password": "password"}),
+            content_type="application/json",
+        )
+        token = response.json()["token"]
+        self.assertIn("oi", jwt.decode(token, options={"verify_signature": False}))
+
+        response = self.client.post(
+            reverse("refresh_token"),
+            json.dumps({"token": token}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        payload = utils.jwt_decode_handler(response.json()["token"])
+        self.assertEqual(payload["sub"], str(self.user.pk))
+        self.assertIn("orig_iat", payload)
@@ -0,0 +1,92 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.shortcuts import reverse
+from django.test import TestCase, modify_settings, override_settings
+from django.test.client import Client
+from django.urls import set_script_prefix
+from jwt_auth.exemptions import ExemptionMatcher
+
+
+class ExemptionMatcherTestCase(TestCase):
+    def test_path(self):
+        matcher = ExemptionMatcher(["/token-auth/"])
+        self.assertTrue(matcher.matches("/token-auth/", "POST"))
+        self.assertFalse(matcher.matches("/token-auth/foo/", "POST"))
+        self.assertFalse(matcher.matches("/token-auth", "POST"))
+
+    def test_prefix(self):
+        matcher = ExemptionMatcher(
+            [{"prefix": "/static/"}, {"prefix": "/health"}, {"prefix": "/st"}]
+        )
+        self.assertTrue(matcher.matches("/static/app.css", "GET"))
+        self.assertTrue(matcher.matches("/health", "GET"))
+        self.assertTrue(matcher.matches("/healthz/", "GET"))
+        self.assertTrue(matcher.matches("/store/", "GET"))
+        self.assertFalse(matcher.matches("/s", "GET"))
+        self.assertFalse(matcher.matches("/api/static/", "GET"))
+
+    def test_regex(self):
+        matcher = ExemptionMatcher(
+            [{"regex": r"/public/\d+/$"}, {"regex": r"/docs/", "methods": ["GET"]}]
+        )
+        self.assertTrue(matcher.matches("/public/1/", "DELETE"))
+        self.assertFalse(matcher.matches("/public/a/", "GET"))
+        self.assertFalse(matcher.matches("/api/public/1/", "GET"))
+        self.assertTrue(matcher.matches("/docs/index.html", "GET"))
+        self.assertFalse(matcher.matches("/docs/index.html", "POST"))
+
+    def test_name(self):
+        matcher = ExemptionMatcher([{"name": "plain"}])
+        self.assertTrue(matcher.matches(reverse("plain"), "GET"))
+
+        with self.assertRaises(ImproperlyConfigured):
+            ExemptionMatcher([{"name": "unknown"}])
+
+    def test_name_script_prefix(self):
+        path = reverse("plain")
+        set_script_prefix("/api/")
+        self.addCleanup(set_script_prefix, "/")
+        matcher = ExemptionMatcher([{"name": "plain"}])
+        self.assertTrue(matcher.matches(path, "GET"))
+
+    def test_methods(self):
+        matcher = ExemptionMatcher(
+            [
+                {"prefix": "/static/", "methods": ["get", "HEAD"]},
+                {"prefix": "/static/", "methods": ["OPTIONS"]},
+                {"path": "/login/", "methods": ["POST"]},
+                "/login/",
+            ]
+        )
+        self.assertTrue(matcher.matches("/static/a.css", "HEAD"))
+        self.assertTrue(matcher.matches("/static/a.css", "OPTIONS"))
+        self.assertFalse(matcher.matches("/static/a.css", "POST"))
+        # The rule without methods exempts all of them
+        self.assertTrue(matcher.matches("/login/", "GET"))
+
+    def test_invalid_rule(self):
+        with self.assertRaises(ImproperlyConfigured):
+            ExemptionMatcher([{"prefix": "/a/", "path": "/b/"}])
+        with self.assertRaises(ImproperlyConfigured):
+            ExemptionMatcher([{"methods": ["GET"]}])
+
+
+@modify_settings(
+    MIDDLEWARE={"append": "jwt_auth.middleware.RequiredJWTAuthenticationMiddleware"}
+)
+class ExemptionMiddlewareTestCase(TestCase):
+    def setUp(self):
+        self.client = Client()
+
+    @override_settings(JWT_EXEMPT_URLS=[{"name": "plain", "methods": ["GET"]}])
+    def test_exempted(self):
+        self.assertEqual(self.client.get(reverse("plain")).status_code, 200)
+        self.assertEqual(self.client.post(reverse("plain")).status_code, 401)
+        self.assertEqual(self.client.get(reverse("protected")).status_code, 401)
+
+    @override_settings(JWT_EXEMPT_URLS=[{"prefix": "/pla"}])
+    def test_login_urls(self):
+        response = self.client.post(
+            reverse("auth_token"), {}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(reverse("plain")).status_code, 200)
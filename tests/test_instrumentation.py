@@ -0,0 +1,106 @@
+from django.shortcuts import reverse
+from django.test import TestCase, override_settings
+from django.test.client import Client
+from jwt_auth import mixins, utils
+from jwt_auth.core import User
+from jwt_auth.instrumentation import MetricsAggregator, metrics
+
+INSTRUMENT = "jwt_auth.instrumentation.metrics"
+
+
+class MetricsAggregatorTestCase(TestCase):
+    def test_histogram(self):
+        aggregator = MetricsAggregator(buckets=(0.001, 0.01))
+        aggregator("decode", 0.0005, "ok")
+        aggregator("decode", 0.005, "ok")
+        aggregator("decode", 0.5, "ok")
+        aggregator("decode", 0.002, "expired")
+
+        ok = aggregator.snapshot()["decode"]["ok"]
+        self.assertEqual(ok["count"], 3)
+        self.assertEqual(ok["max"], 0.5)
+        self.assertEqual(ok["buckets"], {0.001: 1, 0.01: 2, float("inf"): 3})
+        self.assertEqual(aggregator.snapshot()["decode"]["expired"]["count"], 1)
+
+        exposition = aggregator.to_prometheus()
+        self.assertIn(
+            'jwt_auth_stage_duration_seconds_bucket{stage="decode",outcome="ok",'
+            'le="+Inf"} 3',
+            exposition,
+        )
+        self.assertIn(
+            'jwt_auth_stage_duration_seconds_count{stage="decode",outcome="expired"} 1',
+            exposition,
+        )
+
+        aggregator.reset()
+        self.assertEqual(aggregator.snapshot(), {})
+
+
+@override_settings(JWT_INSTRUMENT=INSTRUMENT)
+class InstrumentationTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("foo", "foo@example.com", "password")
+        self.client = Client()
+        metrics.reset()
+
+    def get_outcomes(self, stage):
+        return {
+            outcome: series["count"]
+            for outcome, series in metrics.snapshot().get(stage, {}).items()
+        }
+
+    def test_authenticated(self):
+        token = utils.jwt_encode_handler(utils.jwt_payload_handler(self.user))
+        response = self.client.get(
+            reverse("protected"), HTTP_AUTHORIZATION="Bearer {0}".format(token)
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_outcomes("header"), {"ok": 1})
+        self.assertEqual(self.get_outcomes("decode"), {"ok": 1})
+        self.assertEqual(self.get_outcomes("user"), {"ok": 1})
+
+    @override_settings(JWT_TOKEN_CACHE_SIZE=10)
+    def test_cache_hit(self):
+        token = utils.jwt_encode_handler(utils.jwt_payload_handler(self.user))
+        for _ in range(2):
+            self.client.get(
+                reverse("protected"), HTTP_AUTHORIZATION="Bearer {0}".format(token)
+            )
+
+        self.assertEqual(self.get_outcomes("decode"), {"ok": 1, "cache_hit": 1})
+
+    def test_failures(self):
+        token = utils.jwt_encode_handler(utils.jwt_payload_handler(self.user))
+        header, claims, _ = token.split(".")
+        forged = "Bearer {0}.{1}.c2lnbmF0dXJl".format(header, claims)
+
+        for auth in (None, "Bearer", forged):
+            extra = {"HTTP_AUTHORIZATION": auth} if auth else {}
+            self.client.get(reverse("protected"), **extra)
+
+        self.assertEqual(
+            self.get_outcomes("header"), {"missing": 1, "invalid_header": 1, "ok": 1}
+        )
+        self.assertEqual(self.get_outcomes("decode"), {"bad_signature": 1})
+
+    def test_user_inactive(self):
+        payload = utils.jwt_payload_handler(self.user)
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertIsNone(mixins.get_user_from_payload(payload))
+        self.assertEqual(self.get_outcomes("user"), {"user_inactive": 1})
+
+    @override_settings(
+        MIDDLEWARE=[
+            "django.contrib.sessions.middleware.SessionMiddleware",
+            "jwt_auth.middleware.JWTAuthenticationMiddleware",
+        ]
+    )
+    def test_session_fallback(self):
+        self.client.get("/plain/")
+
+        self.assertEqual(self.get_outcomes("header"), {"missing": 1})
+        self.assertEqual(self.get_outcomes("session"), {"anonymous": 1})
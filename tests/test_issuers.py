@@ -0,0 +1,187 @@
+import datetime
+from unittest import mock
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec
+from django.core.exceptions import ImproperlyConfigured
+from django.shortcuts import reverse
+from django.test import TestCase, override_settings
+from django.test.client import Client
+from jwt_auth import utils
+from jwt_auth.codec import StdlibJSONCodec
+from jwt_auth.core import User
+from jwt_auth.issuers import peek_issuer
+from jwt_auth.settings import get_settings
+
+TENANT_A_KEY = "tenant-a-secret-key-of-32-bytes!"
+TENANT_B_KEY = ec.generate_private_key(ec.SECP256R1())
+
+
+def get_tenant_user_id(payload):
+    return payload.get("uid")
+
+
+def get_tenant_scopes(payload):
+    return ["auth.view_user"] if "reader" in payload.get("roles", ()) else []
+
+
+ISSUERS = {
+    "https://a.example.com": {
+        "secret_key": TENANT_A_KEY,
+        "audience": "api",
+        "user_id_handler": "tests.test_issuers.get_tenant_user_id",
+    },
+    "https://b.example.com": {
+        "algorithm": "ES256",
+        "public_key": TENANT_B_KEY.public_key(),
+        "leeway": 30,
+        "user_id_handler": "tests.test_issuers.get_tenant_user_id",
+    },
+}
+
+
+def get_token(claims, key=TENANT_A_KEY, algorithm="HS256"):
+    claims.setdefault("exp", datetime.datetime.utcnow() + datetime.timedelta(60))
+    return jwt.encode(claims, key, algorithm)
+
+
+@override_settings(JWT_ISSUERS=ISSUERS)
+class IssuersTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="foo@example.com", password="password", username="foo"
+        )
+
+    def test_registry(self):
+        issuers = get_settings().ISSUERS
+        self.assertEqual(set(issuers), set(ISSUERS))
+        issuer = issuers["https://b.example.com"]
+        self.assertEqual(issuer.algorithms, ("ES256",))
+        self.assertEqual(issuer.leeway, 30)
+        self.assertIs(issuer.get_user_id, get_tenant_user_id)
+
+    def test_peek_issuer(self):
+        token = get_token({"iss": "https://a.example.com"})
+        self.assertEqual(peek_issuer(token, StdlibJSONCodec), "https://a.example.com")
+        self.assertIsNone(peek_issuer(get_token({}), StdlibJSONCodec))
+        with self.assertRaises(jwt.DecodeError):
+            peek_issuer("invalid", StdlibJSONCodec)
+
+    def test_issuer_keys(self):
+        token = get_token({"iss": "https://a.example.com", "aud": "api", "user_id": 1})
+        self.assertEqual(utils.jwt_decode_handler(token)["user_id"], 1)
+
+        token = get_token(
+            {"iss": "https://b.example.com", "uid": 1}, TENANT_B_KEY, "ES256"
+        )
+        self.assertEqual(utils.jwt_decode_handler(token)["uid"], 1)
+
+    def test_audience(self):
+        token = get_token({"iss": "https://a.example.com", "aud": "other"})
+        with self.assertRaises(jwt.InvalidAudienceError):
+            utils.jwt_decode_handler(token)
+
+    def test_other_issuer_key(self):
+        # Signed by the key of another issuer
+        token = get_token({"iss": "https://b.example.com", "uid": 1})
+        with self.assertRaises(jwt.InvalidAlgorithmError):
+            utils.jwt_decode_handler(token)
+
+        token = get_token({"iss": "https://a.example.com", "aud": "api"}, "other")
+        with self.assertRaises(jwt.InvalidSignatureError):
+            utils.jwt_decode_handler(token)
+
+    def test_default_verification(self):
+        # The tokens of this service and of the unknown issuers
+        token = utils.jwt_encode_handler(utils.jwt_payload_handler(self.user))
+        self.assertEqual(utils.jwt_decode_handler(token)["user_id"], self.user.pk)
+
+        token = get_token({"iss": "https://c.example.com"})
+        with self.assertRaises(jwt.InvalidSignatureError):
+            utils.jwt_decode_handler(token)
+
+    def test_user_id_handler(self):
+        token = get_token(
+            {"iss": "https://b.example.com", "uid": self.user.pk},
+            TENANT_B_KEY,
+            "ES256",
+        )
+        response = Client().get(
+            reverse("protected"), HTTP_AUTHORIZATION="Bearer {0}".format(token)
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["username"], "foo")
+
+    def test_local_user_id_rejected(self):
+        admin = User.objects.create_superuser("admin", "admin@example.com", "pwd")
+        token = get_token(
+            {
+                "iss": "https://a.example.com",
+                "aud": "api",
+                "sub": str(admin.pk),
+                "user_id": admin.pk,
+            }
+        )
+        response = Client().get(
+            reverse("protected"), HTTP_AUTHORIZATION="Bearer {0}".format(token)
+        )
+        self.assertEqual(response.status_code, 401)
+
+    def test_improperly_configured(self):
+        handler = "tests.test_issuers.get_tenant_user_id"
+        with override_settings(
+            JWT_ISSUERS={"a": {"secret_key": "k", "user_id_handler": handler, "foo": 1}}
+        ):
+            with self.assertRaisesRegex(ImproperlyConfigured, "foo"):
+                get_settings()
+
+        with override_settings(
+            JWT_ISSUERS={"a": {"audience": "api", "user_id_handler": handler}}
+        ):
+            with self.assertRaisesRegex(ImproperlyConfigured, "secret_key"):
+                get_settings()
+
+        with override_settings(JWT_ISSUERS={"a": {"secret_key": "k"}}):
+            with self.assertRaisesRegex(ImproperlyConfigured, "user_id_handler"):
+                get_settings()
+
+    def test_close(self):
+        with override_settings(
+            JWT_ISSUERS={
+                "a": {
+                    "jwks_source": "/nonexistent/jwks.json",
+                    "user_id_handler": "tests.test_issuers.get_tenant_user_id",
+                }
+            }
+        ):
+            key_set = get_settings().ISSUERS["a"].key_set
+            with mock.patch.object(key_set, "stop") as stop:
+                get_settings().close()
+        stop.assert_called_once()
+
+    def test_foreign_scopes_ignored(self):
+        token = get_token(
+            {"iss": "https://a.example.com", "aud": "api", "scope": "auth.view_user"}
+        )
+        payload = utils.jwt_decode_handler(token)
+        self.assertNotIn("scope", payload)
+        self.assertFalse(get_settings().SCOPES.has_scopes(payload, ["auth.view_user"]))
+
+    def test_scopes_handler(self):
+        options = dict(
+            ISSUERS["https://a.example.com"],
+            scopes_handler="tests.test_issuers.get_tenant_scopes",
+        )
+        with override_settings(JWT_ISSUERS={"https://a.example.com": options}):
+            token = get_token(
+                {
+                    "iss": "https://a.example.com",
+                    "aud": "api",
+                    "scp": 1,
+                    "roles": ["reader"],
+                }
+            )
+            payload = utils.jwt_decode_handler(token)
+
+        self.assertNotIn("scp", payload)
+        self.assertEqual(payload["scope"], "auth.view_user")
@@ -0,0 +1,109 @@
+import json
+import tempfile
+import threading
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec
+from django.test import TestCase, override_settings
+from jwt.algorithms import ECAlgorithm
+from jwt_auth import settings, utils
+from jwt_auth.jwks import JWKSProvider
+
+
+def get_jwk(private_key, kid):
+    jwk = json.loads(ECAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": kid, "alg": "ES256", "use": "sig"})
+    return jwk
+
+
+class JWKSHandler(BaseHTTPRequestHandler):
+    jwks = {"keys": []}
+    requests = 0
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        JWKSHandler.requests += 1
+        body = json.dumps(self.jwks).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class JWKSProviderTestCase(TestCase):
+    def setUp(self):
+        self.private_key = ec.generate_private_key(ec.SECP256R1())
+        self.jwks = {"keys": [get_jwk(self.private_key, "key-1")]}
+
+    def get_token(self, kid="key-1"):
+        return jwt.encode(
+            {"user_id": 1}, self.private_key, "ES256", headers={"kid": kid}
+        )
+
+    def test_file_source(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as f:
+            json.dump(self.jwks, f)
+            f.flush()
+            with override_settings(JWT_JWKS_SOURCE=f.name):
+                payload = utils.jwt_decode_handler(self.get_token())
+                provider = settings.JWKS
+
+        self.assertEqual(payload["user_id"], 1)
+        self.assertEqual(len(provider), 1)
+        self.assertLess(provider.age, 5)
+
+    def test_url_source(self):
+        JWKSHandler.jwks = self.jwks
+        JWKSHandler.requests = 0
+        server = HTTPServer(("127.0.0.1", 0), JWKSHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        with override_settings(
+            JWT_JWKS_SOURCE="http://127.0.0.1:{0}/jwks.json".format(
+                server.server_port
+            ),
+            JWT_JWKS_MIN_REFRESH_INTERVAL=60,
+        ):
+            provider = settings.JWKS
+            self.assertEqual(utils.jwt_decode_handler(self.get_token())["user_id"], 1)
+
+            # Unknown kid is rejected without waiting for a fetch
+            with self.assertRaises(jwt.InvalidSignatureError):
+                utils.jwt_decode_handler(self.get_token("key-2"))
+
+        self.assertEqual(JWKSHandler.requests, 1)
+        # Forced refreshes are rate-limited
+        self.assertFalse(provider.refresh(force=True))
+        self.assertTrue(provider.refresh())
+        self.assertEqual(JWKSHandler.requests, 2)
+
+    def test_failed_refresh_keeps_keys(self):
+        provider = JWKSProvider("/nonexistent/jwks.json")
+        provider.keys = JWKSProvider.parse(self.jwks)
+
+        self.assertFalse(provider.refresh())
+        self.assertIn("key-1", provider.keys)
+
+    def test_local_token_without_kid(self):
+        with override_settings(JWT_JWKS_SOURCE="/nonexistent/jwks.json"):
+            token = utils.jwt_encode_handler({"user_id": 1})
+            with mock.patch.object(JWKSProvider, "fetch") as fetch:
+                payload = utils.jwt_decode_handler(token)
+
+        self.assertEqual(payload["user_id"], 1)
+        fetch.assert_not_called()
+
+    def test_single_background_refresh(self):
+        provider = JWKSProvider("/nonexistent/jwks.json", min_refresh_interval=60)
+        with mock.patch("jwt_auth.jwks.threading.Thread") as thread:
+            for _ in range(3):
+                provider.refresh_in_background()
+
+        self.assertEqual(thread.call_count, 1)
@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from jwt_auth import keys, utils
+
+
+def get_pem_keys(private_key):
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return private_pem, public_pem
+
+
+class KeysTestCase(TestCase):
+    def setUp(self):
+        self.private_pem, self.public_pem = get_pem_keys(
+            rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        )
+
+    def test_keys_are_parsed(self):
+        signing_key = keys.load_signing_key("RS256", None, self.private_pem)
+        verifying_key = keys.load_verifying_key("RS256", None, self.public_pem)
+
+        self.assertIsInstance(signing_key, rsa.RSAPrivateKey)
+        self.assertIsInstance(verifying_key, rsa.RSAPublicKey)
+
+    def test_public_key_from_private_key(self):
+        verifying_key = keys.load_verifying_key(
+            "RS256", None, private_key=self.private_pem
+        )
+        self.assertIsInstance(verifying_key, rsa.RSAPublicKey)
+
+    def test_missing_keys(self):
+        self.assertIsNone(keys.load_signing_key("RS256", "secret"))
+
+        with self.assertRaises(ImproperlyConfigured):
+            keys.load_verifying_key("RS256", "secret")
+
+        with self.assertRaises(ImproperlyConfigured):
+            keys.load_verifying_key("XX256", "secret")
+
+
+class AsymmetricAlgorithmTestCase(TestCase):
+    def patch_keys(self, algorithm, private_pem, public_pem):
+        override = override_settings(
+            JWT_ALGORITHM=algorithm,
+            JWT_PRIVATE_KEY=private_pem,
+            JWT_PUBLIC_KEY=public_pem,
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_rs256(self):
+        private_pem, public_pem = get_pem_keys(
+            rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        )
+        self.patch_keys("RS256", private_pem, public_pem)
+
+        token = utils.jwt_encode_handler({"user_id": 1})
+        self.assertEqual(jwt.get_unverified_header(token)["alg"], "RS256")
+        self.assertEqual(utils.jwt_decode_handler(token)["user_id"], 1)
+
+    def test_eddsa(self):
+        private_pem, public_pem = get_pem_keys(ed25519.Ed25519PrivateKey.generate())
+        self.patch_keys("EdDSA", private_pem, public_pem)
+
+        token = utils.jwt_encode_handler({"user_id": 1})
+        self.assertEqual(utils.jwt_decode_handler(token)["user_id"], 1)
+
+    def test_hmac_token_rejected(self):
+        token = utils.jwt_encode_handler({"user_id": 1})
+        private_pem, public_pem = get_pem_keys(ed25519.Ed25519PrivateKey.generate())
+        self.patch_keys("EdDSA", private_pem, public_pem)
+
+        with self.assertRaises(jwt.InvalidAlgorithmError):
+            utils.jwt_decode_handler(token)
+
+    def test_verify_only(self):
+        _, public_pem = get_pem_keys(ed25519.Ed25519PrivateKey.generate())
+        self.patch_keys("EdDSA", None, public_pem)
+
+        with self.assertRaises(ImproperlyConfigured):
+            utils.jwt_encode_handler({"user_id": 1})
+
+
+class KeyRingTestCase(TestCase):
+    def setUp(self):
+        self.private_pem, _ = get_pem_keys(ed25519.Ed25519PrivateKey.generate())
+        self.keyring_settings = {
+            "old": {"algorithm": "EdDSA", "private_key": self.private_pem},
+            "new": {"secret_key": "new-secret"},
+        }
+
+    def use_keyring(self, signing_kid):
+        return override_settings(
+            JWT_KEYRING=self.keyring_settings,
+            JWT_SIGNING_KID=signing_kid,
+            JWT_KEYRING_GRACE_PERIOD=timedelta(hours=1),
+        )
+
+    def test_kid_header(self):
+        with self.use_keyring("old"):
+            old_token = utils.jwt_encode_handler({"user_id": 1})
+        with self.use_keyring("new"):
+            new_token = utils.jwt_encode_handler({"user_id": 2})
+
+            self.assertEqual(jwt.get_unverified_header(old_token)["kid"], "old")
+            self.assertEqual(jwt.get_unverified_header(new_token)["alg"], "HS256")
+            # Both keys verify
+            self.assertEqual(utils.jwt_decode_handler(old_token)["user_id"], 1)
+            self.assertEqual(utils.jwt_decode_handler(new_token)["user_id"], 2)
+
+    def test_unknown_kid(self):
+        token = jwt.encode({"user_id": 1}, "new-secret", headers={"kid": "foo"})
+        with self.use_keyring("new"):
+            with self.assertRaises(jwt.InvalidSignatureError):
+                utils.jwt_decode_handler(token)
+
+            # Without kid header
+            with self.assertRaises(jwt.InvalidSignatureError):
+                utils.jwt_decode_handler(jwt.encode({"user_id": 1}, "new-secret"))
+
+    def test_grace_period(self):
+        with self.use_keyring("old"):
+            token = utils.jwt_encode_handler({"user_id": 1})
+
+        self.keyring_settings["old"]["retired_at"] = datetime.utcnow()
+        with self.use_keyring("new"):
+            self.assertEqual(utils.jwt_decode_handler(token)["user_id"], 1)
+
+        self.keyring_settings["old"]["retired_at"] -= timedelta(hours=2)
+        with self.use_keyring("new"):
+            with self.assertRaises(jwt.InvalidSignatureError):
+                utils.jwt_decode_handler(token)
+
+    def test_without_signing_kid(self):
+        # Signed by JWT_SECRET_KEY without kid header
+        with self.use_keyring(None):
+            token = utils.jwt_encode_handler({"user_id": 1})
+            self.assertNotIn("kid", jwt.get_unverified_header(token))
+            self.assertEqual(utils.jwt_decode_handler(token)["user_id"], 1)
+
+    def test_unknown_signing_kid(self):
+        with self.assertRaises(ImproperlyConfigured):
+            keys.KeyRing.from_settings(self.keyring_settings, "foo", "HS256", 0)
@@ -1,7 +1,15 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import HttpResponse
 from django.shortcuts import reverse
-from django.test import TestCase, modify_settings
-from django.test.client import Client
+from django.test import RequestFactory, TestCase, modify_settings, override_settings
+from django.test.client import AsyncClient, Client
+from jwt_auth import mixins, utils
 from jwt_auth.core import User
+from jwt_auth.middleware import JWTAuthenticationMiddleware
+from jwt_auth.settings import get_settings
 
 
 class MiddlewareTestCase(TestCase):
@@ -58,6 +66,53 @@ class JWTAuthenticationMiddlewareTestCase(MiddlewareTestCase):
         self.assertEqual(response.json()["username"], "foo")
 
 
+@override_settings(JWT_LAZY_USER=True)
+class LazyJWTAuthenticationMiddlewareTestCase(MiddlewareTestCase):
+    def setUp(self):
+        super().setUp()
+        token = utils.jwt_encode_handler(utils.jwt_payload_handler(self.user))
+        self.request = RequestFactory().get(
+            self.plain_url, HTTP_AUTHORIZATION="Bearer {0}".format(token)
+        )
+        self.middleware = JWTAuthenticationMiddleware(lambda request: HttpResponse())
+
+    def test_no_query_without_access(self):
+        with mock.patch("jwt_auth.mixins.get_payload_from_token") as decode:
+            with self.assertNumQueries(0):
+                self.middleware(self.request)
+
+        decode.assert_not_called()
+
+    def test_resolved_on_access(self):
+        self.middleware(self.request)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.request.user.username, "foo")
+            self.assertEqual(self.request.user.username, "foo")
+
+    def test_anonymous(self):
+        request = RequestFactory().get(self.plain_url)
+        self.middleware(request)
+        self.assertFalse(request.user.is_authenticated)
+
+
+@modify_settings(
+    MIDDLEWARE={"append": "jwt_auth.middleware.JWTAuthenticationMiddleware"}
+)
+class AsyncJWTAuthenticationMiddlewareTestCase(MiddlewareTestCase):
+    async def test_anonymous(self):
+        response = await AsyncClient().get(self.plain_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["username"], "")
+
+    async def test_authenticated(self):
+        payload = utils.jwt_payload_handler(self.user)
+        header_value = "Bearer {0}".format(utils.jwt_encode_handler(payload))
+        response = await AsyncClient().get(
+            self.plain_url, headers={"Authorization": header_value}
+        )
+        self.assertEqual(response.json()["username"], "foo")
+
+
 class RequiredJWTAuthenticationMiddlewareTestCase(MiddlewareTestCase):
     @modify_settings(
         MIDDLEWARE={"append": "jwt_auth.middleware.RequiredJWTAuthenticationMiddleware"}
@@ -84,3 +139,163 @@ class RequiredJWTAuthenticationMiddlewareTestCase(MiddlewareTestCase):
             HTTP_AUTHORIZATION=header_value,
         )
         self.assertEqual(response.status_code, 200)
+
+
+@modify_settings(
+    MIDDLEWARE={"append": "jwt_auth.middleware.RequiredJWTAuthenticationMiddleware"}
+)
+class AsyncRequiredJWTAuthenticationMiddlewareTestCase(MiddlewareTestCase):
+    async def test_access_denied(self):
+        response = await AsyncClient().get(self.plain_url)
+        self.assertEqual(response.status_code, 401)
+
+    async def test_access_allowed(self):
+        payload = utils.jwt_payload_handler(self.user)
+        header_value = "Bearer {0}".format(utils.jwt_encode_handler(payload))
+        response = await AsyncClient().get(
+            self.plain_url, headers={"Authorization": header_value}
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+@modify_settings(
+    MIDDLEWARE={
+        "append": [
+            "jwt_auth.middleware.JWTAuthenticationMiddleware",
+            "jwt_auth.middleware.RequiredJWTAuthenticationMiddleware",
+        ]
+    }
+)
+class StackedAuthenticationTestCase(MiddlewareTestCase):
+    def setUp(self):
+        super().setUp()
+        token = utils.jwt_encode_handler(utils.jwt_payload_handler(self.user))
+        self.header_value = "Bearer {0}".format(token)
+
+    def test_verified_once(self):
+        with mock.patch(
+            "jwt_auth.mixins.get_payload_from_token",
+            wraps=mixins.get_payload_from_token,
+        ) as decode:
+            with self.assertNumQueries(1):
+                response = self.client.get(
+                    self.protected_url, HTTP_AUTHORIZATION=self.header_value
+                )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["username"], "foo")
+        decode.assert_called_once()
+
+    def test_failure_kept(self):
+        with mock.patch(
+            "jwt_auth.mixins.get_payload_from_token",
+            wraps=mixins.get_payload_from_token,
+        ) as decode:
+            response = self.client.get(
+                self.protected_url, HTTP_AUTHORIZATION="Bearer invalid"
+            )
+
+        self.assertEqual(response.status_code, 401)
+        decode.assert_called_once()
+
+    async def test_async_verified_once(self):
+        with mock.patch(
+            "jwt_auth.mixins.get_payload_from_token",
+            wraps=mixins.get_payload_from_token,
+        ) as decode:
+            response = await AsyncClient().get(
+                reverse("async_protected"),
+                headers={"Authorization": self.header_value},
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["username"], "foo")
+        decode.assert_called_once()
+
+    def test_request_attributes(self):
+        request = RequestFactory().get(
+            self.plain_url, HTTP_AUTHORIZATION=self.header_value
+        )
+        JWTAuthenticationMiddleware(lambda request: HttpResponse())(request)
+        self.assertEqual(request.token, self.header_value.split()[1])
+        self.assertEqual(request.jwt_payload["user_id"], self.user.pk)
+
+
+@modify_settings(
+    MIDDLEWARE={"append": "jwt_auth.middleware.JWTAuthenticationMiddleware"}
+)
+@override_settings(JWT_SLIDING_EXPIRATION=0.5, JWT_ALLOW_REFRESH=True)
+class SlidingExpirationTestCase(MiddlewareTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def get_header_value(self, age, lifetime=300, **claims):
+        payload = utils.jwt_payload_handler(self.user)
+        now = int(time.time())
+        payload.update(iat=now - age, exp=now - age + lifetime, orig_iat=now - age)
+        payload.update(claims)
+        payload = {name: value for name, value in payload.items() if value is not None}
+        return "Bearer {0}".format(utils.jwt_encode_handler(payload))
+
+    def test_fresh_token(self):
+        response = self.client.get(
+            self.plain_url, HTTP_AUTHORIZATION=self.get_header_value(10)
+        )
+        self.assertEqual(response.json()["username"], "foo")
+        self.assertNotIn("X-Refreshed-Token", response)
+
+    def test_reissued_once(self):
+        header_value = self.get_header_value(200, tenant="acme")
+        with mock.patch.object(get_settings(), "JWT_PAYLOAD_HANDLER") as handler:
+            response = self.client.get(self.plain_url, HTTP_AUTHORIZATION=header_value)
+        handler.assert_not_called()
+
+        # The claims are reused, the expiration is renewed
+        old_payload = utils.jwt_decode_handler(header_value.split()[1])
+        payload = utils.jwt_decode_handler(response["X-Refreshed-Token"])
+        self.assertEqual(payload["tenant"], "acme")
+        self.assertEqual(payload["user_id"], self.user.pk)
+        self.assertGreater(payload["exp"], old_payload["exp"])
+        self.assertNotEqual(payload["jti"], old_payload["jti"])
+
+        response = self.client.get(self.plain_url, HTTP_AUTHORIZATION=header_value)
+        self.assertNotIn("X-Refreshed-Token", response)
+
+    def test_anonymous(self):
+        response = self.client.get(self.plain_url, HTTP_AUTHORIZATION="Bearer invalid")
+        self.assertNotIn("X-Refreshed-Token", response)
+
+    def test_refresh_expired(self):
+        orig_iat = int(time.time()) - 3600
+        response = self.client.get(
+            self.plain_url,
+            HTTP_AUTHORIZATION=self.get_header_value(200, orig_iat=orig_iat),
+        )
+        self.assertNotIn("X-Refreshed-Token", response)
+
+    def test_without_orig_iat(self):
+        response = self.client.get(
+            self.plain_url, HTTP_AUTHORIZATION=self.get_header_value(200, orig_iat=None)
+        )
+        self.assertNotIn("X-Refreshed-Token", response)
+
+    @override_settings(JWT_SLIDING_EXPIRATION=None)
+    def test_disabled(self):
+        response = self.client.get(
+            self.plain_url, HTTP_AUTHORIZATION=self.get_header_value(290)
+        )
+        self.assertNotIn("X-Refreshed-Token", response)
+
+    @override_settings(JWT_ALLOW_REFRESH=False)
+    def test_refresh_disallowed(self):
+        response = self.client.get(
+            self.plain_url, HTTP_AUTHORIZATION=self.get_header_value(290)
+        )
+        self.assertNotIn("X-Refreshed-Token", response)
+
+    async def test_async(self):
+        response = await AsyncClient().get(
+            self.plain_url, headers={"Authorization": self.get_header_value(200)}
+        )
+        self.assertIn("X-Refreshed-Token", response)
@@ -1,8 +1,10 @@
+from django.contrib.auth.models import Permission
+from django.middleware.csrf import _get_new_csrf_string
 from django.shortcuts import reverse
-from django.test import TestCase
-from django.test.client import Client
-from jwt_auth import utils
-from jwt_auth.core import User
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.client import AsyncClient, Client
+from jwt_auth import exceptions, mixins, utils
+from jwt_auth.core import TokenUser, User
 
 
 class JSONWebTokenAuthMixinTestCase(TestCase):
@@ -102,3 +104,160 @@ class JSONWebTokenAuthMixinTestCase(TestCase):
 
         expected_error = ["Error decoding signature."]
         self.assertEqual(response.json()["errors"], expected_error)
+
+
+class TokenFromRequestTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_parse_authorization_header(self):
+        self.assertEqual(
+            mixins.parse_authorization_header("Bearer abc", "bearer"), "abc"
+        )
+        self.assertEqual(
+            mixins.parse_authorization_header(" bearer \tabc ", "bearer"), "abc"
+        )
+
+        for header in ("Basic abc", "Bearerabc", "Bear"):
+            with self.assertRaises(exceptions.AuthenticationFailed) as context:
+                mixins.parse_authorization_header(header, "bearer")
+            self.assertEqual(context.exception.code, "missing")
+
+        for header in ("Bearer ", "Bearer a b", "Bearer a\tb"):
+            with self.assertRaises(exceptions.AuthenticationFailed) as context:
+                mixins.parse_authorization_header(header, "bearer")
+            self.assertEqual(context.exception.code, "invalid_header")
+
+    def test_str_token(self):
+        request = self.factory.get("/", HTTP_AUTHORIZATION="Bearer abc")
+        self.assertEqual(mixins.get_token_from_request(request), "abc")
+
+    @override_settings(JWT_AUTH_COOKIE="jwt", JWT_AUTH_QUERY_PARAM="access_token")
+    def test_other_sources(self):
+        request = self.factory.get("/", {"access_token": "query"})
+        self.assertEqual(mixins.get_token_from_request(request), "query")
+
+        request.COOKIES["jwt"] = "cookie"
+        self.assertEqual(mixins.get_token_from_request(request), "cookie")
+
+        request.META["HTTP_AUTHORIZATION"] = "Bearer header"
+        self.assertEqual(mixins.get_token_from_request(request), "header")
+
+        request.META["HTTP_AUTHORIZATION"] = "Basic Zm9vOmJhcg=="
+        self.assertEqual(mixins.get_token_from_request(request), "cookie")
+
+    @override_settings(JWT_AUTH_COOKIE="jwt")
+    def test_cookie_csrf(self):
+        request = self.factory.post("/")
+        request.COOKIES["jwt"] = "cookie"
+        with self.assertRaises(exceptions.AuthenticationFailed) as context:
+            mixins.get_token_from_request(request)
+        self.assertEqual(context.exception.code, "csrf_failed")
+
+        # The header isn't sent by the browsers on their own
+        request.META["HTTP_AUTHORIZATION"] = "Bearer header"
+        self.assertEqual(mixins.get_token_from_request(request), "header")
+
+        csrf_token = _get_new_csrf_string()
+        request = self.factory.post("/", HTTP_X_CSRFTOKEN=csrf_token)
+        request.COOKIES.update({"jwt": "cookie", "csrftoken": csrf_token})
+        self.assertEqual(mixins.get_token_from_request(request), "cookie")
+
+    def test_other_sources_disabled(self):
+        request = self.factory.get("/", {"access_token": "query"})
+        request.COOKIES["jwt"] = "cookie"
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            mixins.get_token_from_request(request)
+
+
+class AsyncJSONWebTokenAuthMixinTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("foo", "foo@example.com", "password")
+        self.client = AsyncClient()
+        self.protected_url = reverse("async_protected")
+
+    async def test_passing_jwt_auth(self):
+        payload = utils.jwt_payload_handler(self.user)
+        token = utils.jwt_encode_handler(payload)
+
+        auth = "Bearer {0}".format(token)
+        response = await self.client.get(
+            self.protected_url, headers={"Authorization": auth}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["username"], "foo")
+
+    async def test_failing_jwt_auth(self):
+        response = await self.client.get(self.protected_url)
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response["WWW-Authenticate"], 'JWT realm="api"')
+
+
+@override_settings(JWT_TOKEN_USER=True)
+class TokenUserTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("foo", "foo@example.com", "password")
+        self.payload = utils.jwt_payload_handler(self.user)
+        self.client = Client()
+        self.protected_url = reverse("protected")
+
+    def test_no_query(self):
+        auth = "Bearer {0}".format(utils.jwt_encode_handler(self.payload))
+        with self.assertNumQueries(0):
+            response = self.client.get(self.protected_url, HTTP_AUTHORIZATION=auth)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["username"], "foo")
+
+    def test_token_user(self):
+        self.payload["first_name"] = "Foo"
+        token_user = TokenUser(self.user.pk, self.payload, ("first_name",))
+
+        self.assertTrue(token_user.is_authenticated)
+        self.assertEqual(token_user.get_username(), "foo")
+        self.assertEqual(token_user.first_name, "Foo")
+        self.assertEqual(token_user, self.user)
+        with self.assertRaises(AttributeError):
+            token_user.last_name
+
+        with self.assertNumQueries(1):
+            self.assertEqual(token_user.get_user().email, "foo@example.com")
+            token_user.get_user()
+
+    def test_permissions(self):
+        token_user = TokenUser(
+            self.user.pk, self.payload, scopes=frozenset(("auth.view_user",))
+        )
+
+        self.assertTrue(token_user.has_perm("auth.view_user"))
+        self.assertFalse(token_user.has_perm("auth.view_user", obj=self.user))
+        self.assertFalse(token_user.has_perm("auth.change_user"))
+        self.assertTrue(token_user.has_perms(["auth.view_user"]))
+        self.assertFalse(token_user.has_perms(["auth.view_user", "auth.add_user"]))
+        self.assertTrue(token_user.has_module_perms("auth"))
+        self.assertFalse(token_user.has_module_perms("admin"))
+        with self.assertNumQueries(0):
+            self.assertEqual(list(token_user.groups.all()), [])
+            self.assertEqual(list(token_user.user_permissions.all()), [])
+
+    @override_settings(
+        JWT_TOKEN_USER=True, JWT_EMBED_SCOPES=True, JWT_SCOPES=["auth.view_user"]
+    )
+    def test_permission_required(self):
+        self.user.user_permissions.add(Permission.objects.get(codename="view_user"))
+        user = User.objects.get(pk=self.user.pk)
+        token = utils.jwt_encode_handler(utils.jwt_payload_handler(user))
+        response = self.client.get(
+            reverse("permission_required"),
+            HTTP_AUTHORIZATION="Bearer {0}".format(token),
+        )
+        self.assertEqual(response.status_code, 200)
+
+        token = utils.jwt_encode_handler(self.payload)
+        response = self.client.get(
+            reverse("permission_required"),
+            HTTP_AUTHORIZATION="Bearer {0}".format(token),
+        )
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,172 @@
+import os
+import subprocess
+import sys
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.shortcuts import reverse
+from django.test import TestCase, override_settings
+from django.test.client import Client
+from django.utils import timezone
+from jwt_auth import refresh_tokens, revocation, utils
+from jwt_auth.core import User
+from jwt_auth.exceptions import InvalidRefreshToken
+from jwt_auth.models import RefreshToken
+
+
+class RefreshTokenTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("foo", "foo@example.com", "password")
+
+    def test_hashed(self):
+        token = refresh_tokens.issue_refresh_token(self.user)
+
+        row = RefreshToken.objects.get()
+        self.assertNotEqual(row.token_hash, token)
+        self.assertEqual(row.token_hash, refresh_tokens.hash_token(token))
+
+    def test_rotation(self):
+        token = refresh_tokens.issue_refresh_token(self.user)
+        user, new_token = refresh_tokens.rotate_refresh_token(token)
+
+        self.assertEqual(user, self.user)
+        self.assertNotEqual(new_token, token)
+        rows = RefreshToken.objects.order_by("pk")
+        self.assertEqual(rows[0].family, rows[1].family)
+        self.assertIsNotNone(rows[0].used_at)
+
+    def test_reuse_revokes_family(self):
+        token = refresh_tokens.issue_refresh_token(self.user)
+        other_token = refresh_tokens.issue_refresh_token(self.user)
+        _, new_token = refresh_tokens.rotate_refresh_token(token)
+
+        with self.assertRaises(InvalidRefreshToken):
+            refresh_tokens.rotate_refresh_token(token)
+        with self.assertRaises(InvalidRefreshToken):
+            refresh_tokens.rotate_refresh_token(new_token)
+
+        # The other logins are kept
+        refresh_tokens.rotate_refresh_token(other_token)
+
+    def test_expired(self):
+        token = refresh_tokens.issue_refresh_token(self.user)
+        RefreshToken.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        with self.assertRaisesMessage(
+            InvalidRefreshToken, "Refresh token has expired."
+        ):
+            refresh_tokens.rotate_refresh_token(token)
+
+    def test_inactive_user(self):
+        token = refresh_tokens.issue_refresh_token(self.user)
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(InvalidRefreshToken):
+            refresh_tokens.rotate_refresh_token(token)
+
+    def test_delete_expired(self):
+        for _ in range(5):
+            refresh_tokens.issue_refresh_token(self.user)
+        RefreshToken.objects.filter(
+            pk__in=RefreshToken.objects.order_by("pk").values("pk")[:3]
+        ).update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(refresh_tokens.delete_expired_refresh_tokens(batch_size=2), 3)
+        self.assertEqual(RefreshToken.objects.count(), 2)
+
+        stdout = StringIO()
+        call_command("clean_refresh_tokens", stdout=stdout)
+        self.assertEqual(stdout.getvalue(), "Deleted 0 expired refresh tokens.\n")
+
+
+@override_settings(JWT_REFRESH_TOKENS=True)
+class RefreshTokenViewsTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("foo", "foo@example.com", "password")
+        self.client = Client()
+
+    def refresh(self, refresh_token):
+        return self.client.post(
+            reverse("refresh_token_pair"),
+            {"refresh_token": refresh_token},
+            content_type="application/json",
+        )
+
+    def test_token_pair(self):
+        response = self.client.post(
+            reverse("auth_token"),
+            {"username": "foo", "password": "password"},
+            content_type="application/json",
+        )
+        refresh_token = response.json()["refresh_token"]
+        self.assertEqual(response.json()["refresh_expires_in"], 14 * 24 * 3600)
+
+        with self.assertNumQueries(3):
+            response = self.refresh(refresh_token)
+        self.assertEqual(response.status_code, 200)
+        payload = utils.jwt_decode_handler(response.json()["token"])
+        self.assertEqual(payload["user_id"], self.user.pk)
+        self.assertNotEqual(response.json()["refresh_token"], refresh_token)
+
+        response = self.refresh(refresh_token)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["errors"]["__all__"], ["Invalid refresh token."]
+        )
+
+    @override_settings(
+        JWT_REVOCATION_STORE="jwt_auth.revocation.LocalRevocationStore"
+    )
+    def test_revoke_user(self):
+        response = self.client.post(
+            reverse("auth_token"),
+            {"username": "foo", "password": "password"},
+            content_type="application/json",
+        )
+        refresh_token = response.json()["refresh_token"]
+        revocation.revoke_user(self.user)
+
+        self.assertEqual(self.refresh(refresh_token).status_code, 400)
+
+    @override_settings(
+        JWT_REVOCATION_STORE="jwt_auth.revocation.LocalRevocationStore"
+    )
+    def test_rotated_before_revocation(self):
+        refresh_token = refresh_tokens.issue_refresh_token(self.user)
+        # Revoked by another process, the row survived
+        revocation.get_revocation_store().revoke_user(self.user.pk)
+
+        with self.assertRaises(InvalidRefreshToken):
+            refresh_tokens.rotate_refresh_token(refresh_token)
+        self.assertFalse(RefreshToken.objects.exists())
+
+    @override_settings(JWT_REFRESH_TOKENS=False)
+    def test_disabled(self):
+        response = self.client.post(
+            reverse("auth_token"),
+            {"username": "foo", "password": "password"},
+            content_type="application/json",
+        )
+        self.assertNotIn("refresh_token", response.json())
+
+
+class OptionalAppTestCase(TestCase):
+    def test_import_without_app(self):
+        """The app is only required by the refresh tokens and the DB store."""
+        code = (
+            "import django\n"
+            "from django.conf import settings\n"
+            "settings.configure(INSTALLED_APPS=['django.contrib.auth', "
+            "'django.contrib.contenttypes'], SECRET_KEY='key')\n"
+            "django.setup()\n"
+            "import jwt_auth.forms, jwt_auth.middleware, jwt_auth.views\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
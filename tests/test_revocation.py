@@ -0,0 +1,190 @@
+import time
+from datetime import datetime
+from unittest import mock
+
+from django.shortcuts import reverse
+from django.test import TestCase, override_settings
+from django.test.client import Client
+from jwt_auth import revocation, utils
+from jwt_auth.core import User
+from jwt_auth.revocation import (
+    CacheRevocationStore,
+    DatabaseRevocationStore,
+    RevocationIndex,
+)
+
+
+class RevocationIndexTestCase(TestCase):
+    def test_prune(self):
+        index = RevocationIndex()
+        index.add("a", time.time(), time.time() + 60)
+        index.add("b", time.time(), time.time() - 1)
+
+        self.assertIsNotNone(index.get("a"))
+        self.assertIsNone(index.get("b"))
+        self.assertEqual(len(index), 1)
+
+    def test_extended_entry(self):
+        index = RevocationIndex()
+        index.add("a", time.time(), time.time() - 1)
+        index.add("a", time.time(), time.time() + 60)
+        index.prune()
+
+        self.assertIsNotNone(index.get("a"))
+
+
+@override_settings(
+    JWT_REVOCATION_STORE="jwt_auth.revocation.LocalRevocationStore",
+)
+class RevocationTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("foo", "foo@example.com", "password")
+        self.client = Client()
+        self.protected_url = reverse("protected")
+
+    def get_token(self):
+        payload = utils.jwt_payload_handler(self.user)
+        return payload, utils.jwt_encode_handler(payload)
+
+    def get(self, token):
+        return self.client.get(
+            self.protected_url, HTTP_AUTHORIZATION="Bearer {0}".format(token)
+        )
+
+    def test_revoke_token(self):
+        payload, token = self.get_token()
+        _, other_token = self.get_token()
+        self.assertEqual(self.get(token).status_code, 200)
+
+        revocation.revoke_token(payload)
+
+        response = self.get(token)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()["errors"], ["Token has been revoked."])
+        self.assertEqual(self.get(other_token).status_code, 200)
+
+    @override_settings(JWT_LEEWAY=30)
+    def test_revoked_during_leeway(self):
+        payload, _ = self.get_token()
+        payload["exp"] = int(time.time()) - 10
+        token = utils.jwt_encode_handler(payload)
+        revocation.revoke_token(payload)
+
+        response = self.get(token)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()["errors"], ["Token has been revoked."])
+
+        revocation.revoke_user(self.user)
+        _, expires_at = revocation.get_revocation_store().index._entries[
+            "user:{0}".format(self.user.pk)
+        ]
+        self.assertGreater(expires_at, time.time() + 300 + 29)
+
+    def test_revoke_user(self):
+        payload, token = self.get_token()
+        payload["iat"] = int(time.time()) - 10
+        old_token = utils.jwt_encode_handler(payload)
+
+        with mock.patch("time.time", return_value=time.time() - 5):
+            revocation.revoke_user(self.user)
+
+        self.assertEqual(self.get(old_token).status_code, 401)
+        # Tokens issued after the revocation are accepted
+        self.assertEqual(self.get(token).status_code, 200)
+
+    def test_revoke_user_same_second(self):
+        now = int(time.time())
+        with mock.patch("time.time", return_value=now + 0.2):
+            revocation.revoke_user(self.user)
+
+        payload, _ = self.get_token()
+        payload["iat"] = utils.get_issued_at(datetime.utcfromtimestamp(now + 0.1))
+        self.assertEqual(self.get(utils.jwt_encode_handler(payload)).status_code, 401)
+        # Re-login in the same second
+        payload["iat"] = utils.get_issued_at(datetime.utcfromtimestamp(now + 0.3))
+        self.assertEqual(self.get(utils.jwt_encode_handler(payload)).status_code, 200)
+
+    @override_settings(JWT_ALLOW_REFRESH=True)
+    def test_refresh_revoked(self):
+        payload, token = self.get_token()
+        payload["orig_iat"] = int(time.time())
+        token = utils.jwt_encode_handler(payload)
+        revocation.revoke_token(payload)
+
+        response = self.client.post(
+            reverse("refresh_token"), {"token": token}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class SharedRevocationStoreTestCase(TestCase):
+    def setUp(self):
+        self.payload = {"user_id": 1, "jti": "abc", "exp": time.time() + 60}
+
+    def test_cache_store(self):
+        store = CacheRevocationStore()
+        other_store = CacheRevocationStore()
+        store.revoke_token(self.payload)
+
+        self.assertTrue(store.is_revoked(self.payload))
+        self.assertFalse(other_store.index.get("jti:abc"))
+        other_store.sync()
+        self.assertTrue(other_store.is_revoked(self.payload))
+        store.stop()
+        other_store.stop()
+
+    def test_cache_store_evicted_sequence(self):
+        store = CacheRevocationStore()
+        other_store = CacheRevocationStore()
+        for jti in ("a", "b", "c"):
+            store.revoke("jti:{0}".format(jti), time.time() + 60)
+        other_store.sync()
+
+        store.cache.delete(store.seq_key)
+        with mock.patch("time.time", return_value=time.time() + 1):
+            for jti in ("d", "e", "f", "g"):
+                store.revoke("jti:{0}".format(jti), time.time() + 60)
+        other_store.sync()
+
+        for jti in ("d", "e", "f", "g"):
+            self.assertIsNotNone(other_store.index.get("jti:{0}".format(jti)))
+
+    def test_database_store(self):
+        store = DatabaseRevocationStore()
+        other_store = DatabaseRevocationStore()
+        store.revoke_token(self.payload)
+        store.revoke("jti:expired", time.time() - 1)
+
+        other_store.sync()
+        self.assertTrue(other_store.is_revoked(self.payload))
+        self.assertIsNone(other_store.index.get("jti:expired"))
+
+        other_store.prune()
+        self.assertEqual(store.model.objects.count(), 1)
+        store.stop()
+        other_store.stop()
+
+    def test_database_store_late_commit(self):
+        store = DatabaseRevocationStore()
+        other_store = DatabaseRevocationStore()
+        now = time.time()
+        store.model.objects.create(
+            pk=100,
+            key="jti:abc",
+            revoked_at=store.model.to_datetime(now),
+            expires_at=store.model.to_datetime(now + 60),
+        )
+        other_store.sync()
+
+        # Revoked earlier by another process, committed after the sync
+        store.model.objects.create(
+            pk=50,
+            key="jti:late",
+            revoked_at=store.model.to_datetime(now - 10),
+            expires_at=store.model.to_datetime(now + 60),
+        )
+        other_store.sync()
+
+        self.assertIsNotNone(other_store.index.get("jti:late"))
+        # The overlapping rows aren't added again
+        self.assertEqual(len(other_store.index._expirations), 2)
@@ -0,0 +1,103 @@
+from django.contrib.auth.models import Permission
+from django.core.exceptions import ImproperlyConfigured
+from django.shortcuts import reverse
+from django.test import TestCase, override_settings
+from django.test.client import Client
+from jwt_auth import utils
+from jwt_auth.core import User
+from jwt_auth.scopes import Scopes
+
+SCOPES = ["auth.view_user", "auth.change_user", "auth.delete_user"]
+
+
+class ScopesTestCase(TestCase):
+    def test_scope_string(self):
+        scopes = Scopes()
+        claims = scopes.encode({"b", "a"})
+        self.assertEqual(claims, {"scope": "a b"})
+        self.assertEqual(scopes.parse(claims), frozenset(("a", "b")))
+        self.assertIs(scopes.parse(claims), scopes.parse({"scope": "a b"}))
+        self.assertTrue(scopes.has_scopes(claims, ("a",)))
+        self.assertFalse(scopes.has_scopes(claims, ("a", "c")))
+        self.assertEqual(scopes.parse({}), frozenset())
+        self.assertEqual(scopes.parse({"scp": ["a", "b"]}), frozenset(("a", "b")))
+
+    def test_bitmask(self):
+        scopes = Scopes(SCOPES)
+        claims = scopes.encode({"auth.view_user", "auth.delete_user", "unknown"})
+        self.assertEqual(claims, {"scp": 0b101})
+        self.assertEqual(
+            scopes.parse(claims), frozenset(("auth.view_user", "auth.delete_user"))
+        )
+        self.assertTrue(scopes.has_scopes(claims, ["auth.view_user"]))
+        self.assertFalse(scopes.has_scopes(claims, ["auth.change_user"]))
+        self.assertFalse(scopes.has_scopes(claims, ["unknown"]))
+        # Scope strings are still understood
+        self.assertTrue(scopes.has_scopes({"scope": "unknown"}, ["unknown"]))
+
+    def test_too_many_scopes(self):
+        with self.assertRaises(ImproperlyConfigured):
+            Scopes(str(i) for i in range(65))
+
+
+@override_settings(JWT_EMBED_SCOPES=True, JWT_SCOPES=SCOPES)
+class ScopedViewTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="foo@example.com", password="password", username="foo"
+        )
+        self.client = Client()
+
+    def get(self):
+        # The user is reloaded to clear its cached permissions
+        user = User.objects.get(pk=self.user.pk)
+        token = utils.jwt_encode_handler(utils.jwt_payload_handler(user))
+        return self.client.get(
+            reverse("scoped"), HTTP_AUTHORIZATION="Bearer {0}".format(token)
+        )
+
+    def grant(self, codename):
+        self.user.user_permissions.add(Permission.objects.get(codename=codename))
+
+    def test_denied(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(
+            response.json(),
+            {"errors": ["The token doesn't grant the required scopes."]},
+        )
+
+    def test_allowed(self):
+        self.grant("view_user")
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["username"], "foo")
+
+    @override_settings(JWT_TOKEN_USER=True)
+    def test_bitmask_without_query(self):
+        self.grant("view_user")
+        user = User.objects.get(pk=self.user.pk)
+        payload = utils.jwt_payload_handler(user)
+        self.assertEqual(payload["scp"], 1)
+
+        token = utils.jwt_encode_handler(payload)
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                reverse("scoped"), HTTP_AUTHORIZATION="Bearer {0}".format(token)
+            )
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(JWT_EMBED_SCOPES=False)
+    def test_no_scopes(self):
+        self.grant("view_user")
+        self.assertEqual(self.get().status_code, 403)
+
+    def test_superuser_bounded(self):
+        admin = User.objects.create_superuser("admin", "admin@example.com", "pwd")
+        self.assertEqual(utils.jwt_get_scopes_handler(admin), SCOPES)
+        self.assertEqual(utils.jwt_payload_handler(admin)["scp"], 0b111)
+
+    def test_scopes_required(self):
+        with override_settings(JWT_SCOPES=None):
+            with self.assertRaises(ImproperlyConfigured):
+                utils.jwt_payload_handler(self.user)
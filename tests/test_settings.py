@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from jwt_auth import settings
+
+
+class SettingsTestCase(TestCase):
+    def test_snapshot(self):
+        self.assertIs(settings.get_settings(), settings.get_settings())
+        self.assertEqual(settings.JWT_ALGORITHM, "HS256")
+
+        with self.assertRaises(TypeError):
+            settings.get_settings().DECODE_OPTIONS["verify_exp"] = False
+
+    def test_override_settings(self):
+        snapshot = settings.get_settings()
+        with override_settings(JWT_EXPIRATION_DELTA=timedelta(minutes=1)):
+            self.assertIsNot(settings.get_settings(), snapshot)
+            self.assertEqual(settings.JWT_EXPIRATION_DELTA, timedelta(minutes=1))
+            self.assertEqual(settings.JWT_KEYRING_GRACE_PERIOD, timedelta(minutes=1))
+
+        self.assertEqual(settings.JWT_EXPIRATION_DELTA, timedelta(seconds=300))
+
+    def test_unrelated_setting(self):
+        snapshot = settings.get_settings()
+        with override_settings(USE_TZ=False):
+            self.assertIs(settings.get_settings(), snapshot)
+
+    def test_unknown_setting(self):
+        with self.assertRaises(AttributeError):
+            settings.JWT_FOO  # pylint: disable=pointless-statement
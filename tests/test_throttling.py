@@ -0,0 +1,146 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.shortcuts import reverse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.client import Client
+from jwt_auth.core import User
+from jwt_auth.throttling import (
+    CacheThrottleBackend,
+    LocalThrottleBackend,
+    get_login_throttle,
+    parse_rate,
+)
+
+
+class ParseRateTestCase(SimpleTestCase):
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate("10/min"), (10, 60))
+        self.assertEqual(parse_rate("5/s"), (5, 1))
+        self.assertEqual(parse_rate("100/day"), (100, 86400))
+
+        for rate in ("10", "a/min", "10/week", None):
+            with self.assertRaises(ImproperlyConfigured):
+                parse_rate(rate)
+
+
+class CacheThrottleBackendTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.backend = CacheThrottleBackend()
+
+    def test_limit(self):
+        with mock.patch("time.time", return_value=1000.0):
+            for _ in range(3):
+                self.assertIsNone(self.backend.hit("key", 3, 60))
+            self.assertEqual(self.backend.hit("key", 3, 60), 20)
+            self.assertIsNone(self.backend.hit("other", 3, 60))
+
+    def test_sliding_window(self):
+        with mock.patch("time.time", return_value=1000.0):
+            for _ in range(3):
+                self.backend.hit("key", 3, 60)
+
+        # 10 seconds in the next window, the previous one still weights 2.5
+        # attempts
+        with mock.patch("time.time", return_value=1030.0):
+            self.assertIsNone(self.backend.hit("key", 3, 60))
+            self.assertEqual(self.backend.hit("key", 3, 60), 10)
+
+        # Beyond the next window, the attempts are forgotten
+        with mock.patch("time.time", return_value=1150.0):
+            self.assertIsNone(self.backend.hit("key", 3, 60))
+
+
+class LocalThrottleBackendTestCase(SimpleTestCase):
+    def test_token_bucket(self):
+        backend = LocalThrottleBackend()
+        with mock.patch("time.time", return_value=1000.0):
+            for _ in range(3):
+                self.assertIsNone(backend.hit("key", 3, 60))
+            self.assertEqual(backend.hit("key", 3, 60), 20)
+
+        # A token is refilled every 20 seconds
+        with mock.patch("time.time", return_value=1020.0):
+            self.assertIsNone(backend.hit("key", 3, 60))
+            self.assertIsNotNone(backend.hit("key", 3, 60))
+
+
+@override_settings(
+    JWT_LOGIN_THROTTLE_BACKEND="jwt_auth.throttling.LocalThrottleBackend",
+    JWT_LOGIN_THROTTLE_RATES={"ip": "3/min", "username": "2/min"},
+)
+class LoginThrottleTestCase(TestCase):
+    def setUp(self):
+        get_login_throttle().backend.buckets.clear()
+        User.objects.create_user("foo", "foo@example.com", "password")
+        self.client = Client()
+        self.auth_token_url = reverse("auth_token")
+
+    def login(self, username, password="wrong", **extra):
+        return self.client.post(
+            self.auth_token_url,
+            {"username": username, "password": password},
+            content_type="application/json",
+            **extra
+        )
+
+    def test_username(self):
+        self.assertEqual(self.login("foo").status_code, 400)
+        self.assertEqual(self.login("FOO").status_code, 400)
+
+        with mock.patch("jwt_auth.forms.authenticate") as authenticate:
+            response = self.login("foo", "password", REMOTE_ADDR="10.0.0.1")
+        authenticate.assert_not_called()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "30")
+
+    def test_ip(self):
+        for username in ("a", "b", "c"):
+            self.assertEqual(self.login(username).status_code, 400)
+
+        self.assertEqual(self.login("foo", "password").status_code, 429)
+        self.assertEqual(
+            self.login("foo", "password", REMOTE_ADDR="10.0.0.1").status_code, 200
+        )
+
+    def test_rejected_attempt_not_counted(self):
+        for _ in range(2):
+            self.assertEqual(self.login("foo").status_code, 400)
+        # Throttled by username, the IP address isn't charged
+        self.assertEqual(self.login("foo").status_code, 429)
+
+        self.assertEqual(self.login("a").status_code, 400)
+        self.assertEqual(self.login("b").status_code, 429)
+
+    @override_settings(JWT_LOGIN_THROTTLE_IP_HEADER="HTTP_X_FORWARDED_FOR")
+    def test_ip_header(self):
+        for i, username in enumerate(("a", "b", "c")):
+            forwarded_for = "10.0.0.{0}, 10.0.1.1".format(i)
+            response = self.login(username, HTTP_X_FORWARDED_FOR=forwarded_for)
+            self.assertEqual(response.status_code, 400)
+
+        # The entries before the one of the trusted proxy are ignored
+        response = self.login("d", HTTP_X_FORWARDED_FOR="10.0.0.9, 10.0.1.1")
+        self.assertEqual(response.status_code, 429)
+        response = self.login("d", HTTP_X_FORWARDED_FOR="10.0.1.2")
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(
+        JWT_LOGIN_THROTTLE_IP_HEADER="HTTP_X_FORWARDED_FOR",
+        JWT_LOGIN_THROTTLE_TRUSTED_PROXIES=2,
+    )
+    def test_trusted_proxies(self):
+        throttle = get_login_throttle()
+        request = RequestFactory().get(
+            "/", HTTP_X_FORWARDED_FOR="1.1.1.1, 10.0.0.1, 10.0.1.1"
+        )
+        self.assertEqual(throttle.get_client_ip(request), "10.0.0.1")
+        request = RequestFactory().get("/", HTTP_X_FORWARDED_FOR="10.0.1.1")
+        self.assertEqual(throttle.get_client_ip(request), "127.0.0.1")
+
+    @override_settings(JWT_LOGIN_THROTTLE_BACKEND=None)
+    def test_disabled(self):
+        for _ in range(5):
+            self.assertEqual(self.login("foo").status_code, 400)
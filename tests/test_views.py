@@ -1,11 +1,19 @@
+import threading
 from calendar import timegm
 from datetime import datetime, timedelta
 
+from django.core.cache import cache
 from django.shortcuts import reverse
-from django.test import TestCase
-from django.test.client import Client
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.client import AsyncClient, Client
 from jwt_auth import settings, utils
 from jwt_auth.core import User
+from jwt_auth.executor import BoundedExecutor, PoolFull, get_login_executor
 
 
 class JSONWebTokenTestCase(TestCase):
@@ -85,6 +93,64 @@ class JSONWebTokenTestCase(TestCase):
         self.assertEqual(response.status_code, 400)
 
 
+class AsyncJSONWebTokenTestCase(TransactionTestCase):
+    # The credentials are checked by other threads, they must see the user
+    def setUp(self):
+        self.user = User.objects.create_user("foo", "foo@example.com", "password")
+        self.data = {"username": "foo", "password": "password"}
+        self.client = AsyncClient()
+        self.auth_token_url = reverse("async_auth_token")
+
+    async def test_login(self):
+        response = await self.client.post(
+            self.auth_token_url, self.data, content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        decoded_payload = utils.jwt_decode_handler(response.json()["token"])
+        self.assertEqual(decoded_payload["user_id"], self.user.pk)
+
+    async def test_bad_credentials(self):
+        self.data["password"] = "wrong"
+        response = await self.client.post(
+            self.auth_token_url, self.data, content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(JWT_LOGIN_MAX_WORKERS=1, JWT_LOGIN_MAX_QUEUE=0)
+    async def test_pool_full(self):
+        executor = get_login_executor()
+        release = threading.Event()
+        executor.submit(release.wait)
+        try:
+            response = await self.client.post(
+                self.auth_token_url, self.data, content_type="application/json"
+            )
+        finally:
+            release.set()
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+
+
+class BoundedExecutorTestCase(SimpleTestCase):
+    def test_bounded(self):
+        executor = BoundedExecutor(max_workers=1, max_queue=1)
+        release = threading.Event()
+        futures = [executor.submit(release.wait) for _ in range(2)]
+
+        with self.assertRaises(PoolFull):
+            executor.submit(release.wait)
+
+        release.set()
+        for future in futures:
+            future.result()
+        # The slots are released
+        self.assertTrue(executor.submit(lambda: True).result())
+        executor.shutdown()
+
+
 class RefreshJSONWebTokenTestCase(TestCase):
     def setUp(self):
         self.email = "jpueblo@example.com"
@@ -163,3 +229,58 @@ class RefreshJSONWebTokenTestCase(TestCase):
         )
 
         self.assertEqual(response.status_code, 400)
+
+    def test_invalid_token(self):
+        response = self.client.post(
+            self.refresh_auth_token_url,
+            {"token": "abc123"},
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["errors"]["__all__"], ["Error decoding signature."]
+        )
+
+    @override_settings(
+        JWT_REFRESH_REUSE_CLAIMS=True,
+        JWT_USER_CACHE="jwt_auth.cache.UserCache",
+        JWT_USER_CACHE_LOCAL_SIZE=0,
+    )
+    def test_reuse_claims(self):
+        self.payload["scope"] = "read"
+        data = {"token": utils.jwt_encode_handler(self.payload)}
+        old_payload = utils.jwt_decode_handler(data["token"])
+        self.client.post(
+            self.refresh_auth_token_url, data, content_type="application/json"
+        )
+
+        # The user is found in the cache, the payload isn't rebuilt
+        with self.assertNumQueries(0):
+            response = self.client.post(
+                self.refresh_auth_token_url, data, content_type="application/json"
+            )
+
+        self.assertEqual(response.status_code, 200)
+        decoded_payload = utils.jwt_decode_handler(response.json()["token"])
+        self.assertEqual(decoded_payload["scope"], "read")
+        self.assertEqual(decoded_payload["orig_iat"], self.payload["orig_iat"])
+        self.assertNotEqual(decoded_payload["jti"], old_payload["jti"])
+        self.assertGreaterEqual(decoded_payload["exp"], old_payload["exp"])
+
+    @override_settings(JWT_REFRESH_MIN_INTERVAL=timedelta(minutes=1))
+    def test_min_interval(self):
+        cache.clear()
+        data = {"token": utils.jwt_encode_handler(self.payload)}
+        response = self.client.post(
+            self.refresh_auth_token_url, data, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.post(
+            self.refresh_auth_token_url, data, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["errors"]["__all__"], ["Token refreshed too recently."]
+        )
@@ -6,6 +6,25 @@ from tests import views
 urlpatterns = [
     path("plain/", views.plain_view, name="plain"),
     path("protected/", views.ProtectedView.as_view(), name="protected"),
+    path(
+        "async-protected/",
+        views.AsyncProtectedView.as_view(),
+        name="async_protected",
+    ),
+    path("scoped/", views.ScopedView.as_view(), name="scoped"),
+    path(
+        "permission-required/",
+        views.PermissionRequiredView.as_view(),
+        name="permission_required",
+    ),
     path("token-auth/", jwt_auth_views.jwt_token, name="auth_token"),
+    path(
+        "async-token-auth/", jwt_auth_views.async_jwt_token, name="async_auth_token"
+    ),
     path("token-refresh/", jwt_auth_views.refresh_jwt_token, name="refresh_token"),
+    path(
+        "token-pair-refresh/",
+        jwt_auth_views.refresh_token_pair,
+        name="refresh_token_pair",
+    ),
 ]
@@ -1,3 +1,4 @@
+from django.contrib.auth.mixins import PermissionRequiredMixin
 from django.http import JsonResponse
 from django.views.generic import View
 from jwt_auth.mixins import JSONWebTokenAuthMixin
@@ -8,6 +9,25 @@ class ProtectedView(JSONWebTokenAuthMixin, View):
         return JsonResponse({"username": request.user.username})
 
 
+class AsyncProtectedView(JSONWebTokenAuthMixin, View):
+    async def get(self, request):
+        return JsonResponse({"username": request.user.username})
+
+
+class ScopedView(JSONWebTokenAuthMixin, View):
+    required_scopes = ("auth.view_user",)
+
+    def get(self, request):
+        return JsonResponse({"username": request.user.username})
+
+
+class PermissionRequiredView(JSONWebTokenAuthMixin, PermissionRequiredMixin, View):
+    permission_required = "auth.view_user"
+
+    def get(self, request):
+        return JsonResponse({"username": request.user.username})
+
+
 def plain_view(request):
     return JsonResponse(
         {"username": request.user.username if getattr(request, "user", None) else None}